@@ -14,8 +14,90 @@ class Settings(BaseSettings):
     doc_out_dir: str = Field(default="storage/docs", alias="DOC_OUT_DIR")
     template_dir: str = "templates"
     resumes_dir: str = Field(default="storage/resumes", alias="RESUMES_DIR")
+    cache_dir: str = Field(default="storage/cache", alias="CACHE_DIR")
+    templates_auto_reload: bool = Field(default=True, alias="TEMPLATES_AUTO_RELOAD")  # re-read edited templates (mtime check)
     playwright_headless: bool = Field(default=False, alias="PLAYWRIGHT_HEADLESS")
 
+    # Browser pool (shared Chromium instances for connectors + PDF rendering)
+    browser_pool_size: int = Field(default=2, alias="BROWSER_POOL_SIZE")
+    browser_warm_on_startup: bool = Field(default=True, alias="BROWSER_WARM_ON_STARTUP")
+    browser_max_uses: int = Field(default=50, alias="BROWSER_MAX_USES")      # recycle after N leases
+    browser_max_rss_mb: int = Field(default=1024, alias="BROWSER_MAX_RSS_MB")  # recycle above this RSS (needs psutil)
+    browser_lease_timeout: float = Field(default=120.0, alias="BROWSER_LEASE_TIMEOUT")
+    browser_start_timeout: float = Field(default=30.0, alias="BROWSER_START_TIMEOUT")  # Playwright driver start per worker
+
+    # Request interception on connector pages (comma-separated lists)
+    block_heavy_resources: bool = Field(default=True, alias="BLOCK_HEAVY_RESOURCES")
+    blocked_resource_types: str = Field(default="image,media,font", alias="BLOCKED_RESOURCE_TYPES")
+    blocked_hosts_extra: str = Field(default="", alias="BLOCKED_HOSTS_EXTRA")
+    allowed_url_patterns_extra: str = Field(default="", alias="ALLOWED_URL_PATTERNS_EXTRA")
+
+    # Greenhouse public boards API (override to point at a local stub)
+    greenhouse_api_base: str = Field(default="https://boards-api.greenhouse.io/v1", alias="GREENHOUSE_API_BASE")
+
+    # Shared HTTP client (JD fetches, source importers); HTTP/2 needs httpx[http2]
+    http2_enabled: bool = Field(default=True, alias="HTTP2_ENABLED")
+    http_max_connections: int = Field(default=50, alias="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive: int = Field(default=20, alias="HTTP_MAX_KEEPALIVE")
+    http_keepalive_expiry: float = Field(default=30.0, alias="HTTP_KEEPALIVE_EXPIRY")
+    http_per_host: int = Field(default=6, alias="HTTP_PER_HOST")  # concurrent requests per host
+    http_timeout: float = Field(default=20.0, alias="HTTP_TIMEOUT")
+    http_connect_timeout: float = Field(default=5.0, alias="HTTP_CONNECT_TIMEOUT")
+
+    # Bulk board imports (POST /sources/import-bulk): boards fetched at once
+    import_concurrency: int = Field(default=16, alias="IMPORT_CONCURRENCY")
+
+    # Discovered form schemas cached on Job.fields_schema
+    form_schema_ttl_hours: float = Field(default=168.0, alias="FORM_SCHEMA_TTL_HOURS")
+
+    # Batch PDF rendering: pages rendering at once inside one browser context
+    pdf_batch_concurrency: int = Field(default=4, alias="PDF_BATCH_CONCURRENCY")
+
+    # Content-addressed PDF cache (<doc_out_dir>/pdf_cache), LRU-evicted past the size cap
+    pdf_cache_enabled: bool = Field(default=True, alias="PDF_CACHE_ENABLED")
+    pdf_cache_max_mb: float = Field(default=500.0, alias="PDF_CACHE_MAX_MB")
+
+    # JD snapshots (jd_snapshots): trusted for this long, then revalidated with a conditional GET
+    jd_snapshot_ttl_hours: float = Field(default=24.0, alias="JD_SNAPSHOT_TTL_HOURS")
+    jd_snapshot_keep_html: bool = Field(default=True, alias="JD_SNAPSHOT_KEEP_HTML")
+
+    # JD digest (Job.jd_digest): condensed posting used by every prompt
+    jd_digest_ttl_hours: float = Field(default=168.0, alias="JD_DIGEST_TTL_HOURS")
+    jd_digest_text_ttl_hours: float = Field(default=1.0, alias="JD_DIGEST_TEXT_TTL_HOURS")  # fallback (model unavailable) digests
+    jd_digest_max_input_chars: int = Field(default=12000, alias="JD_DIGEST_MAX_INPUT_CHARS")
+    jd_digest_fallback_chars: int = Field(default=3000, alias="JD_DIGEST_FALLBACK_CHARS")
+
+    # QABank retrieval (BM25 per qa_pack_id): rows sent to each prompt
+    qa_top_k_jd: int = Field(default=8, alias="QA_TOP_K_JD")
+    qa_top_k_question: int = Field(default=3, alias="QA_TOP_K_QUESTION")
+    qa_max_rows: int = Field(default=12, alias="QA_MAX_ROWS")
+
+    # Answer memory: reuse approved/submitted answers for recurring questions
+    answer_memory_enabled: bool = Field(default=True, alias="ANSWER_MEMORY_ENABLED")
+    answer_memory_min_similarity: float = Field(default=0.75, alias="ANSWER_MEMORY_MIN_SIMILARITY")
+    answer_memory_personalize: bool = Field(default=False, alias="ANSWER_MEMORY_PERSONALIZE")
+
+    # LLM limits (shared by sync and async calls); defaults match the Gemini free tier
+    llm_max_concurrency: int = Field(default=4, alias="LLM_MAX_CONCURRENCY")
+    llm_rpm: float = Field(default=10.0, alias="LLM_RPM")
+    llm_tpm: float = Field(default=250000.0, alias="LLM_TPM")
+    llm_output_token_estimate: int = Field(default=800, alias="LLM_OUTPUT_TOKEN_ESTIMATE")
+    llm_max_retries: int = Field(default=4, alias="LLM_MAX_RETRIES")
+    llm_retry_base_seconds: float = Field(default=1.0, alias="LLM_RETRY_BASE_SECONDS")
+    llm_retry_max_seconds: float = Field(default=30.0, alias="LLM_RETRY_MAX_SECONDS")
+
+    # LLM response cache (<cache_dir>/llm_cache.sqlite3)
+    llm_cache_enabled: bool = Field(default=True, alias="LLM_CACHE_ENABLED")
+    llm_cache_ttl_hours: float = Field(default=168.0, alias="LLM_CACHE_TTL_HOURS")
+    llm_cache_max_entries: int = Field(default=5000, alias="LLM_CACHE_MAX_ENTRIES")
+
+    # Debug artifacts (<doc_out_dir>/debug/<run_id>)
+    debug_traces: bool = Field(default=True, alias="DEBUG_TRACES")  # kept only for failed submits
+    debug_screenshot_quality: int = Field(default=60, alias="DEBUG_SCREENSHOT_QUALITY")
+    debug_full_page_screenshots: bool = Field(default=False, alias="DEBUG_FULL_PAGE_SCREENSHOTS")
+    debug_artifacts_max_mb: float = Field(default=500.0, alias="DEBUG_ARTIFACTS_MAX_MB")
+    debug_artifacts_max_age_days: float = Field(default=7.0, alias="DEBUG_ARTIFACTS_MAX_AGE_DAYS")
+
     # DB
     database_url: str = Field(default="sqlite:///./local.db", alias="DATABASE_URL")
 
@@ -28,6 +110,11 @@ class Settings(BaseSettings):
         p = Path(self.doc_out_dir)
         return p if p.is_absolute() else (_PROJECT_ROOT / p)
 
+    @property
+    def cache_path(self) -> Path:
+        p = Path(self.cache_dir)
+        return p if p.is_absolute() else (_PROJECT_ROOT / p)
+
     @property
     def template_path(self) -> Path:
         p = Path(self.template_dir)
@@ -12,6 +12,12 @@ if sys.platform.startswith("win"):
 from pathlib import Path
 from fastapi import FastAPI
 from .config import settings
+from .utils.browser import (
+    get_browser_pool,
+    shutdown_async_browser_pools,
+    shutdown_browser_pools,
+)
+from .utils.http import close_http_client, close_sync_http_client, get_http_client
 
 app = FastAPI(title=settings.app_name)
 
@@ -26,6 +32,7 @@ from .routes import jobs as jobs_routes
 from .routes import autopilot as autopilot_routes
 from .routes import apply as apply_routes
 from .routes import sources as sources_routes
+from .routes import qa as qa_routes
 
 app.include_router(profiles_routes.router)
 app.include_router(packages_routes.router)
@@ -33,6 +40,26 @@ app.include_router(jobs_routes.router)
 app.include_router(autopilot_routes.router)
 app.include_router(apply_routes.router)
 app.include_router(sources_routes.router)
+app.include_router(qa_routes.router)
+
+@app.on_event("startup")
+def warm_browsers():
+    if settings.browser_warm_on_startup:
+        get_browser_pool(headless=True).warm_up()
+
+@app.on_event("startup")
+async def open_http_client():
+    get_http_client()  # pooled client for this loop: JD fetches + importers
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await close_http_client()
+    close_sync_http_client()
+
+@app.on_event("shutdown")
+async def close_browsers():
+    await shutdown_async_browser_pools()
+    shutdown_browser_pools()
 
 @app.get("/health")
 def health():
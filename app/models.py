@@ -4,7 +4,7 @@ Keep them simple for now; extend as features grow.
 """
 
 from datetime import datetime
-from sqlalchemy import String, Text, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy import String, Text, Integer, DateTime, ForeignKey, JSON, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 from .database import Base
 
@@ -38,6 +38,26 @@ class QABank(Base):
     tags: Mapped[str] = mapped_column(String(256), default="")
 
 
+class AnswerMemory(Base):
+    """
+    Answers you approved or submitted, reused for recurring form questions.
+    One row per (profile, question fingerprint); see services/answer_memory.py.
+    """
+    __tablename__ = "answer_memory"
+    __table_args__ = (UniqueConstraint("profile_id", "fingerprint", name="uq_answer_memory_profile_fp"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), index=True)
+    fingerprint: Mapped[str] = mapped_column(String(40))
+    question: Mapped[str] = mapped_column(Text)      # normalized; the company name reads "company"
+    answer: Mapped[str] = mapped_column(Text)        # the company name is stored as {company}
+    source: Mapped[str] = mapped_column(String(40), default="submitted")  # submitted|approved
+    company: Mapped[str] = mapped_column(String(200), default="")  # where it was last approved
+    uses: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
 class Job(Base):
     """
     Imported job posting (one row per URL).
@@ -52,10 +72,47 @@ class Job(Base):
     title: Mapped[str] = mapped_column(String(200), default="")
     location: Mapped[str] = mapped_column(String(200), default="")
     ats_type: Mapped[str] = mapped_column(String(80), default="")
+    # captured by the board importers (sources/*), empty for CSV imports
+    department: Mapped[str] = mapped_column(String(200), default="")
+    external_id: Mapped[str] = mapped_column(String(120), default="")  # board posting id
+    source_updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)  # plain-text JD
     fields_schema: Mapped[dict] = mapped_column(JSON, default={})  # structure varies by ATS
+    jd_digest: Mapped[dict | None] = mapped_column(JSON, nullable=True)  # see services/jd_digest.py
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class JDText(Base):
+    """
+    Extracted posting text, stored once per content hash
+    (reposted or cross-listed jobs share a row).
+    """
+    __tablename__ = "jd_texts"
+
+    hash: Mapped[str] = mapped_column(String(40), primary_key=True)  # sha1 of text
+    text: Mapped[str] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 
+class JDSnapshot(Base):
+    """
+    Last fetched copy of a job's posting page, with the validators needed
+    for conditional refetches; see services/jd_store.py.
+    """
+    __tablename__ = "jd_snapshots"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id"), unique=True)
+    url: Mapped[str] = mapped_column(String(1000), default="")   # final URL after redirects
+    title: Mapped[str] = mapped_column(String(200), default="")
+    html_gz: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)  # zlib-compressed raw HTML
+    text_hash: Mapped[str] = mapped_column(ForeignKey("jd_texts.hash"), index=True)
+    etag: Mapped[str] = mapped_column(String(256), default="")
+    last_modified: Mapped[str] = mapped_column(String(64), default="")
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)  # last 200
+    checked_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)  # last 200 or 304
+
+
 class Application(Base):
     """
     One application attempt (linked to a Job + Profile).
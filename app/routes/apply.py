@@ -5,26 +5,30 @@ import asyncio
 import traceback
 from datetime import datetime
 from pathlib import Path
-from uuid import uuid4
+from typing import Any, Dict
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from ..config import settings
 from ..database import get_db
-from ..models import Application, Job, Profile, QABank
-from ..services.doc_gen import render_resume_html, html_to_pdf
-from ..services.jd_parser import fetch_job_details
-from ..services.tailoring import (
-    generate_resume_context,
-    draft_answers,
-    standard_answers,
-)
-from ..services.connectors.greenhouse import (
-    collect_questions,
-    submit_greenhouse,
+from ..models import Application, Job, Profile
+from ..services.jd_digest import job_jd_text
+from ..services.qa_index import relevant_experience
+from ..services.packages import attach_package, build_package_async
+from ..services.answer_memory import adraft_answers_with_memory, remember_submitted
+from ..services.tailoring import standard_answers
+from ..services.artifacts import new_run_id
+from ..services.connectors.greenhouse_async import AsyncFormSession
+from ..services.form_cache import (
+    form_entry_url,
+    fresh_form_schema,
+    schema_questions,
+    store_form_schema,
 )
+from ..services.sources.greenhouse import fetch_greenhouse_questions
 from ..services.tracker import log_to_excel
 
 router = APIRouter(prefix="/apply", tags=["apply"])
@@ -42,16 +46,18 @@ class ApplyRequest(BaseModel):
     profile_id: int = 1
     simulate: bool = True
     resume_mode: str = "ai"  # "ai" or "static"
+    qa_pack_id: str = "default"  # QABank pack to draw experience from
     debug: bool = False          # NEW
 
 
 
 @router.post("")
-def apply_once(body: ApplyRequest, db: Session = Depends(get_db)):
+async def apply_once(body: ApplyRequest, db: Session = Depends(get_db)):
     """
     Preview then submit an application to a supported ATS (MVP: Greenhouse).
     - In simulate mode, returns: resume_pdf path, scraped questions, ai-drafted answers.
     - On real submit, also writes Application row + logs to applications.xlsx.
+    Browser work runs on the event loop; blocking LLM/Excel calls go to the threadpool.
     """
     try:
         # --- 0) Load job & profile ---
@@ -83,75 +89,110 @@ def apply_once(body: ApplyRequest, db: Session = Depends(get_db)):
         # Ensure output directory exists for generated PDFs
         Path(settings.doc_out_dir).mkdir(parents=True, exist_ok=True)
 
-        # --- 1) Fetch JD text (async helper run from sync route) ---
-        jd_details = asyncio.run(fetch_job_details(job.url))
-        jd_text = jd_details.get("jd_text", "")
+        # --- 1) Fetch JD text ---
+        # (stored digest of the posting; built and saved on first use)
+        jd_text = await job_jd_text(db, job)
 
         # --- 2) Experience bank from QABank (your truth source) ---
-        qa_rows = db.query(QABank).all()
-        exp_bank = [{"base_answer": r.base_answer, "tags": r.tags} for r in qa_rows]
-
-        # --- 3) Resume (AI-tailored or static master) ---
-        if body.resume_mode == "static" and prof.resume_path:
-            resume_pdf_path = prof.resume_path
-        else:
-            resume_ctx = generate_resume_context(profile, jd_text, exp_bank)
-            resume_pdf_path = str(
-                Path(settings.doc_out_dir) / f"resume_{uuid4().hex}.pdf"
+        # only the pack's rows relevant to this JD (BM25 top-k; small banks pass through whole)
+        exp_bank = relevant_experience(db, body.qa_pack_id, jd_text=jd_text)
+
+        # --- 3) Resume (static master, or AI resume + cover letter package) ---
+        async def _package() -> Dict[str, Any]:
+            if body.resume_mode == "static" and prof.resume_path:
+                return {"resume_pdf": prof.resume_path, "cover_pdf": None}
+            # one model call for both documents, rendered back to back on one page
+            return await build_package_async(
+                profile, jd_text, exp_bank, job.company or "", job.title or ""
             )
-            html = render_resume_html(resume_ctx)
-            # convert HTML -> PDF (Playwright)
-            html_to_pdf(html, resume_pdf_path)
-
-        # --- 4) Scrape application questions + draft AI answers ---
-        # (connector normalizes Datadog-style wrapper links to real Greenhouse)
-        questions = collect_questions(job.url, job.company or "")
-        custom_answers = draft_answers(questions, profile, exp_bank, jd_text)
-
-        # --- 5) Structured fields (name/email/phone) ---
-        std = standard_answers(profile)
-
-        # --- 6) Preview only ---
-        if body.simulate:
-            return {
-                "simulate": True,
-                "job": {
-                    "id": job.id,
-                    "title": job.title,
-                    "company": job.company,
-                    "url": job.url,
-                    "ats": job.ats_type,
-                },
-                "resume_pdf": resume_pdf_path,
-                "found_questions": questions,
-                "draft_answers": custom_answers,
-            }
-
-        # --- 7) Real submit (opens browser, uploads, fills, submits) ---
-        confirmation, dbg = submit_greenhouse(
-            job.url,
-            std,
-            resume_pdf_path,
-            custom_answers,
-            job.company or "",
-            debug=body.debug,
-        )
+
+        # --- 4) Questions: cached schema or boards API for previews, else open
+        # the form once (concurrently with the resume) and keep it open for submit.
+        # (connector normalizes Datadog-style wrapper links to real Greenhouse;
+        #  the page stays open while the LLM drafts, then submit reuses it)
+        schema = fresh_form_schema(job)
+        if body.simulate and schema is None:
+            # boards JSON API: one small request instead of a browser session
+            api_fields = await fetch_greenhouse_questions(job.url, job.company or "")
+            if api_fields:
+                store_form_schema(db, job, "", api_fields, source="api")
+                schema = job.fields_schema
+        session = None
+        if not body.simulate or schema is None:
+            session = AsyncFormSession(
+                form_entry_url(job), job.company or "",
+                headless=True if body.simulate else None,
+                debug=body.debug and not body.simulate,
+                run_id=new_run_id(f"job{job.id}"),
+            )
+        try:
+            steps = [_package()] + ([session.open()] if session else [])
+            results = await asyncio.gather(*steps, return_exceptions=True)
+            for res in results:
+                if isinstance(res, BaseException):
+                    raise res
+            package = results[0]
+            resume_pdf_path = package["resume_pdf"]
+
+            if session is not None:
+                store_form_schema(db, job, session.form_url, session.fields)
+                questions = session.questions
+            else:
+                questions = schema_questions(schema)
+            answer_bank = relevant_experience(db, body.qa_pack_id, jd_text=jd_text, questions=questions)
+            # remembered answers for recurring questions; only the rest go to the model
+            custom_answers, answer_sources = await adraft_answers_with_memory(
+                db, prof.id, questions, profile, answer_bank, jd_text,
+                company=job.company or "", role=job.title or "",
+            )
+
+            # --- 5) Structured fields (name/email/phone) ---
+            std = standard_answers(profile)
+
+            # --- 6) Preview only ---
+            if body.simulate:
+                return {
+                    "simulate": True,
+                    "job": {
+                        "id": job.id,
+                        "title": job.title,
+                        "company": job.company,
+                        "url": job.url,
+                        "ats": job.ats_type,
+                    },
+                    "resume_pdf": resume_pdf_path,
+                    "cover_letter_pdf": package.get("cover_pdf"),
+                    "found_questions": questions,
+                    "draft_answers": custom_answers,
+                    "answer_sources": answer_sources,
+                    "form_schema": "browser" if session else schema.get("source", "cache"),
+                    "debug": {"waits": session.waits.steps} if (body.debug and session) else {},
+                }
+
+            # --- 7) Real submit on the same page (uploads, fills, submits) ---
+            confirmation, dbg = await session.submit(std, resume_pdf_path, custom_answers)
+        finally:
+            if session is not None:
+                await session.close()
 
         # --- 8) Persist Application row ---
         app_row = Application(
             job_id=job.id,
             profile_id=prof.id,
-            qa_pack_id="default",
+            qa_pack_id=body.qa_pack_id,
             status="submitted",
             confirmation_number=confirmation,
             submitted_at=datetime.utcnow(),
-            resume_version=("static" if body.resume_mode == "static" else "ai-v1"),
+            notes=(f"debug_run={dbg['artifacts']['run_id']}" if dbg.get("artifacts") else ""),
         )
+        attach_package(app_row, package, resume_default="static")
         db.add(app_row)
         db.commit()
+        remember_submitted(db, prof.id, custom_answers, answer_sources, company=job.company or "")
 
         # --- 9) Log to Excel tracker ---
-        xlsx = log_to_excel(
+        xlsx = await run_in_threadpool(
+            log_to_excel,
             "applications.xlsx",
             {
                 "company": job.company,
@@ -14,6 +14,7 @@ class BatchRequest(BaseModel):
     resume_mode: str = Field("static", pattern="^(ai|static)$")
     submit: bool = True
     delay_seconds: float = Field(3.0, ge=0, le=10)
+    qa_pack_id: str = "default"
 
 @router.post("/run")
 def run_autopilot(req: BatchRequest, db: Session = Depends(get_db)):
@@ -24,4 +25,5 @@ def run_autopilot(req: BatchRequest, db: Session = Depends(get_db)):
         resume_mode=req.resume_mode,
         submit=req.submit,
         delay_seconds=req.delay_seconds,
+        qa_pack_id=req.qa_pack_id,
     )
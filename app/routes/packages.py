@@ -1,19 +1,92 @@
 """
 Endpoints to generate application “packages” (resume/cover PDFs).
-For MVP, we demo just the resume generation.
 """
 
-from uuid import uuid4
-from pathlib import Path
-from fastapi import APIRouter
-from ..services.doc_gen import render_resume_html, html_to_pdf
-from ..config import settings
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models import Application, Job, Profile
+from ..services.doc_gen import render_resume_html, html_to_pdf_async, html_to_pdf_batch_async
+from ..services.jd_digest import build_jd_digests, job_jd_text, store_jd_digests
+from ..services.qa_index import relevant_experience
+from ..services.packages import attach_package, build_package_async
+from ..services.tailoring import agenerate_resume_context
 
 router = APIRouter(prefix="/packages", tags=["packages"])
 
 
+def _profile_dict(prof: Profile) -> dict:
+    return {
+        "name": prof.name,
+        "email": prof.email,
+        "phone": prof.phone,
+        "location": prof.location,
+        "skills": [s.strip() for s in (prof.skills_csv or "").split(",") if s.strip()],
+    }
+
+
+class PackageRequest(BaseModel):
+    profile_id: int
+    job_id: int
+    application_id: Optional[int] = None  # attach both PDFs to this Application row
+    qa_pack_id: str = "default"
+
+
+@router.post("")
+async def generate_package(body: PackageRequest, db: Session = Depends(get_db)):
+    """
+    Tailored resume + cover letter for one job: one model call for both
+    contexts, both PDFs rendered back to back on one browser page.
+    """
+    prof = db.query(Profile).get(body.profile_id)
+    if not prof:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    job = db.query(Job).get(body.job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    app_row = None
+    if body.application_id is not None:
+        app_row = db.query(Application).get(body.application_id)
+        if not app_row:
+            raise HTTPException(status_code=404, detail="Application not found")
+        if app_row.job_id != job.id:
+            raise HTTPException(status_code=400, detail="Application belongs to a different job")
+
+    try:
+        jd_text = await job_jd_text(db, job)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Could not fetch job description: {type(e).__name__}: {e}")
+    try:
+        package = await build_package_async(
+            _profile_dict(prof),
+            jd_text,
+            relevant_experience(db, body.qa_pack_id, jd_text=jd_text),
+            job.company or "",
+            job.title or "",
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+    if app_row is not None:
+        attach_package(app_row, package)
+        db.add(app_row)
+        db.commit()
+    return {
+        "ok": True,
+        "job_id": job.id,
+        "application_id": app_row.id if app_row else None,
+        **package,
+    }
+
+
 @router.post("/generate-resume")
-def generate_resume_demo():
+async def generate_resume_demo():
     """
     Demo-only endpoint: fills a static context to produce a PDF resume.
     Replace with dynamic data from Profile + tailoring later.
@@ -35,6 +108,80 @@ def generate_resume_demo():
         ],
     }
     html = render_resume_html(context)
-    out_path = Path(settings.doc_out_dir) / f"resume_{uuid4().hex}.pdf"
-    pdf_path = html_to_pdf(html, str(out_path))
+    pdf_path = await html_to_pdf_async(html)
     return {"ok": True, "pdf_path": pdf_path}
+
+
+class BatchResumeRequest(BaseModel):
+    profile_id: int
+    job_ids: List[int]
+    concurrency: Optional[int] = None  # pages rendering at once (default PDF_BATCH_CONCURRENCY)
+    qa_pack_id: str = "default"
+
+
+@router.post("/resumes/batch")
+async def generate_resumes_batch(body: BatchResumeRequest, db: Session = Depends(get_db)):
+    """
+    Pre-render tailored resumes for many jobs ahead of submission.
+    JD digests are built and contexts tailored concurrently, and
+    all PDFs render in one browser; per-job failures are reported, not raised.
+    """
+    t_start = time.perf_counter()
+    prof = db.query(Profile).get(body.profile_id)
+    if not prof:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    found = {j.id: j for j in db.query(Job).filter(Job.id.in_(body.job_ids)).all()}
+    if not found:
+        raise HTTPException(status_code=404, detail="No matching jobs")
+    jobs = [found[jid] for jid in dict.fromkeys(body.job_ids) if jid in found]  # request order
+
+    profile = _profile_dict(prof)
+
+    # --- JD text + tailored context per job ---
+    # (model calls fan out under the global LLM concurrency + RPM/TPM limits)
+    jd_texts = store_jd_digests(db, jobs, await build_jd_digests(jobs, db))
+    contexts = await asyncio.gather(
+        *(
+            agenerate_resume_context(
+                profile,
+                jd_texts.get(j.id, ""),
+                relevant_experience(db, body.qa_pack_id, jd_text=jd_texts.get(j.id, "")),
+            )
+            for j in jobs
+        ),
+        return_exceptions=True,
+    )
+    t_tailored = time.perf_counter()
+
+    # --- render everything in one browser ---
+    by_job: Dict[int, dict] = {}
+    docs, doc_jobs = [], []
+    for job, ctx in zip(jobs, contexts):
+        if isinstance(ctx, BaseException):
+            by_job[job.id] = {"job_id": job.id, "ok": False, "error": f"tailoring: {ctx}"}
+            continue
+        docs.append((render_resume_html(ctx), None))
+        doc_jobs.append(job)
+    rendered = await html_to_pdf_batch_async(docs, concurrency=body.concurrency)
+    for job, res in zip(doc_jobs, rendered):
+        by_job[job.id] = {"job_id": job.id, "pdf_path": res["out_path"], **res}
+    # one entry per requested id, in request order
+    results = [
+        by_job.get(jid) or {"job_id": jid, "ok": False, "error": "Job not found"}
+        for jid in body.job_ids
+    ]
+
+    t_end = time.perf_counter()
+    return {
+        "ok": True,
+        "requested": len(body.job_ids),
+        "rendered": sum(1 for r in results if r.get("ok")),
+        "failed": sum(1 for r in results if not r.get("ok")),
+        "cached": sum(1 for r in results if r.get("cached")),
+        "timings_ms": {
+            "tailor": round((t_tailored - t_start) * 1000, 1),
+            "render": round((t_end - t_tailored) * 1000, 1),
+            "total": round((t_end - t_start) * 1000, 1),
+        },
+        "results": results,
+    }
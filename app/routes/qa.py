@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends
+# app/routes/qa.py
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from ..database import get_db
-from ..models import QABank
+from ..models import AnswerMemory, QABank
+from ..services.answer_memory import recall_answers, remember_answers
+from ..services.qa_index import get_qa_index, invalidate_qa_index
 
 router = APIRouter(prefix="/qa", tags=["qa"])
 
@@ -16,9 +21,61 @@ class QAIn(BaseModel):
 def add_qa(body: QAIn, db: Session = Depends(get_db)):
     row = QABank(**body.model_dump())
     db.add(row); db.commit(); db.refresh(row)
+    invalidate_qa_index(row.qa_pack_id)
     return {"id": row.id}
 
 @router.get("")
-def list_qa(db: Session = Depends(get_db)):
-    rows = db.query(QABank).order_by(QABank.id.desc()).all()
-    return [{"id":r.id,"question":r.question,"tags":r.tags} for r in rows]
+def list_qa(qa_pack_id: Optional[str] = None, db: Session = Depends(get_db)):
+    q = db.query(QABank)
+    if qa_pack_id:
+        q = q.filter(QABank.qa_pack_id == qa_pack_id)
+    rows = q.order_by(QABank.id.desc()).all()
+    return [{"id":r.id,"qa_pack_id":r.qa_pack_id,"question":r.question,"tags":r.tags} for r in rows]
+
+@router.get("/search")
+def search_qa(q: str, qa_pack_id: str = "default", k: int = 5, db: Session = Depends(get_db)):
+    """BM25 lookup over one pack: the rows prompts would see for this text."""
+    hits = get_qa_index(db, qa_pack_id).search(q, k)
+    return [{"id": r["id"], "question": r["question"], "tags": r["tags"], "score": round(s, 3)} for r, s in hits]
+
+# ---------- answer memory ----------
+class ApprovedAnswersIn(BaseModel):
+    profile_id: int = 1
+    company: str = ""                # company the answers were written for
+    answers: Dict[str, str]          # {question: approved answer}
+
+@router.post("/memory")
+def approve_answers(body: ApprovedAnswersIn, db: Session = Depends(get_db)):
+    """Store reviewed answers (e.g. an edited /apply preview) for reuse on later forms."""
+    written = remember_answers(db, body.profile_id, body.answers, company=body.company, source="approved")
+    return {"stored": written}
+
+@router.get("/memory")
+def list_memory(profile_id: int = 1, db: Session = Depends(get_db)):
+    rows = (
+        db.query(AnswerMemory)
+        .filter(AnswerMemory.profile_id == profile_id)
+        .order_by(AnswerMemory.updated_at.desc())
+        .all()
+    )
+    return [
+        {"id": r.id, "question": r.question, "answer": r.answer, "source": r.source,
+         "company": r.company, "uses": r.uses, "updated_at": r.updated_at.isoformat(timespec="seconds")}
+        for r in rows
+    ]
+
+@router.get("/memory/recall")
+def recall_memory(q: str, profile_id: int = 1, company: str = "", db: Session = Depends(get_db)):
+    """What memory would answer for one question (exact or near match), or 404."""
+    hit = recall_answers(db, profile_id, [q], company=company).get(q)
+    if hit is None:
+        raise HTTPException(status_code=404, detail="No remembered answer")
+    return hit
+
+@router.delete("/memory/{memory_id}")
+def forget_answer(memory_id: int, db: Session = Depends(get_db)):
+    row = db.query(AnswerMemory).get(memory_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Not found")
+    db.delete(row); db.commit()
+    return {"deleted": memory_id}
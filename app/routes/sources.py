@@ -1,8 +1,10 @@
+from typing import List, Optional
+
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from ..database import get_db
-from ..models import Job
+from ..services.importer import import_boards, upsert_jobs
 from ..services.sources.greenhouse import fetch_greenhouse_company_jobs
 from ..services.sources.lever import fetch_lever_company_jobs
 
@@ -21,15 +23,22 @@ async def import_company_jobs(body: ImportRequest, db: Session = Depends(get_db)
     else:
         raise HTTPException(400, "Unsupported source")
 
-    created = 0
-    for j in jobs:
-        exists = db.query(Job).filter(Job.url == j["url"]).first()
-        if exists: 
-            continue
-        row = Job(
-            url=j["url"], source=j["source"], company=j["company"], title=j["title"],
-            location=j["location"], ats_type=j["ats_type"], fields_schema={}
-        )
-        db.add(row); created += 1
-    db.commit()
-    return {"imported": created, "total_seen": len(jobs)}
+    imported, updated = upsert_jobs(db, [jobs])[0]
+    return {"imported": imported, "updated": updated, "total_seen": len(jobs)}
+
+
+class BoardRef(BaseModel):
+    source: str               # "greenhouse" | "lever"
+    company: str
+
+class BulkImportRequest(BaseModel):
+    boards: List[BoardRef]
+    concurrency: Optional[int] = Field(None, ge=1, le=64)  # boards in flight (default IMPORT_CONCURRENCY)
+
+@router.post("/import-bulk")
+async def import_boards_bulk(body: BulkImportRequest, db: Session = Depends(get_db)):
+    """
+    Import many boards in one call: fetched concurrently (global + per-host limits),
+    written in batches. A failing board shows up with ok=false and its error.
+    """
+    return await import_boards(db, [(b.source, b.company) for b in body.boards], body.concurrency)
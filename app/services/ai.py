@@ -1,54 +1,176 @@
 # app/services/ai.py
 from __future__ import annotations
-import os, json
-from typing import Any, Dict
+import asyncio, os, json, time, weakref
+from typing import Any, Dict, Optional
 from google import genai
 from google.genai import types
 from dotenv import load_dotenv
 
+from ..config import settings
+from .llm_cache import get_llm_cache, llm_cache_key
+from .llm_limits import backoff_delay, get_rate_limiter, is_retryable, llm_slots
+
 load_dotenv()
 
+MODEL = "gemini-2.5-flash"
+
 _client: genai.Client | None = None
+# genai's async transport holds loop-bound connections, so each event loop gets its own client
+_aio_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, genai.Client]" = weakref.WeakKeyDictionary()
 
-def get_client() -> genai.Client:
+def _api_key() -> str:
     key = os.getenv("GEMINI_API_KEY")
     if not key:
         raise RuntimeError("GEMINI_API_KEY is required (set env or .env)")
+    return key
+
+def get_client() -> genai.Client:
     global _client
     if _client is None:
-        _client = genai.Client(api_key=key)
+        _client = genai.Client(api_key=_api_key())
     return _client
 
-def chat_text(system: str, user: str, temperature: float = 0.2) -> str:
-    """
-    Send a single-turn prompt with a system instruction.
-    """
-    resp = get_client().models.generate_content(
-        model="gemini-2.5-flash",
-        # Message must be a list of Content; each Part needs "text"
-        contents=[{"role": "user", "parts": [{"text": user}]}],
-        # System prompt goes here (not as a 'system' message)
-        config=types.GenerateContentConfig(
-            system_instruction=system,
-            temperature=temperature,
-        ),
-    )
-    return (getattr(resp, "text", "") or "").strip()
+def get_async_models():
+    """client.aio.models for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _aio_clients.get(loop)
+    if client is None:
+        client = _aio_clients[loop] = genai.Client(api_key=_api_key())
+    return client.aio.models
 
-def chat_json(system: str, user: str, temperature: float = 0.2) -> Dict[str, Any]:
-    """
-    Ask for strict JSON. If parsing fails, return {}.
-    """
-    resp = get_client().models.generate_content(
-        model="gemini-2.5-flash",
-        contents=[{"role": "user", "parts": [{"text": user}]}],
-        config=types.GenerateContentConfig(
+# ---------- request plumbing (limits + retries) ----------
+def _config(system: str, temperature: float, json_mode: bool) -> types.GenerateContentConfig:
+    # System prompt goes here (not as a 'system' message)
+    if json_mode:
+        return types.GenerateContentConfig(
             system_instruction=system,
             response_mime_type="application/json",
             temperature=temperature,
-        ),
-    )
+        )
+    return types.GenerateContentConfig(system_instruction=system, temperature=temperature)
+
+def _contents(user: str):
+    # Message must be a list of Content; each Part needs "text"
+    return [{"role": "user", "parts": [{"text": user}]}]
+
+def _estimate_tokens(system: str, user: str) -> int:
+    """~4 chars/token for the prompt plus a fixed allowance for the reply."""
+    return (len(system) + len(user)) // 4 + settings.llm_output_token_estimate
+
+def _used_tokens(resp) -> Optional[int]:
+    usage = getattr(resp, "usage_metadata", None)
+    return getattr(usage, "total_token_count", None) if usage is not None else None
+
+def _generate(system: str, user: str, temperature: float, json_mode: bool):
+    """Sync generate_content behind the shared RPM/TPM limiter, with jittered retries."""
+    limiter = get_rate_limiter()
+    est = _estimate_tokens(system, user)
+    attempt = 0
+    while True:
+        with llm_slots():
+            limiter.acquire(est)
+            try:
+                resp = get_client().models.generate_content(
+                    model=MODEL, contents=_contents(user), config=_config(system, temperature, json_mode)
+                )
+            except Exception as e:
+                if attempt >= settings.llm_max_retries or not is_retryable(e):
+                    raise
+            else:
+                limiter.settle(est, _used_tokens(resp))
+                return resp
+        time.sleep(backoff_delay(attempt))  # back off without holding a slot
+        attempt += 1
+
+async def _agenerate(system: str, user: str, temperature: float, json_mode: bool):
+    """_generate on the async client: same limiter and concurrency slots."""
+    limiter = get_rate_limiter()
+    est = _estimate_tokens(system, user)
+    attempt = 0
+    while True:
+        async with llm_slots():
+            await limiter.acquire_async(est)
+            try:
+                resp = await get_async_models().generate_content(
+                    model=MODEL, contents=_contents(user), config=_config(system, temperature, json_mode)
+                )
+            except Exception as e:
+                if attempt >= settings.llm_max_retries or not is_retryable(e):
+                    raise
+            else:
+                limiter.settle(est, _used_tokens(resp))
+                return resp
+        await asyncio.sleep(backoff_delay(attempt))
+        attempt += 1
+
+# ---------- cache helpers ----------
+def _cached(kind: str, system: str, user: str, temperature: float, cache: bool):
+    """(store, key, cached response or None)."""
+    store = get_llm_cache()
+    key = llm_cache_key(kind, MODEL, system, user, temperature)
+    hit = store.get(key) if (store is not None and cache) else None
+    return store, key, hit
+
+def _finish_text(store, key: str, resp) -> str:
+    text = (getattr(resp, "text", "") or "").strip()
+    if store is not None and text:
+        store.put(key, "text", MODEL, text)
+    return text
+
+def _finish_json(store, key: str, raw: Optional[str]) -> Dict[str, Any]:
     try:
-        return json.loads(resp.text or "{}")
+        data = json.loads(raw or "{}")
     except Exception:
         return {}
+    if store is not None and data:
+        store.put(key, "json", MODEL, raw)
+    return data
+
+def _cached_json(hit: Optional[str]) -> Optional[Dict[str, Any]]:
+    if hit is None:
+        return None
+    try:
+        return json.loads(hit)
+    except ValueError:
+        return None
+
+# ---------- public API ----------
+def chat_text(system: str, user: str, temperature: float = 0.2, cache: bool = True) -> str:
+    """
+    Send a single-turn prompt with a system instruction.
+    Identical prompts are served from the LLM cache; cache=False skips the
+    lookup (the fresh response still replaces the cached one).
+    """
+    store, key, hit = _cached("text", system, user, temperature, cache)
+    if hit is not None:
+        return hit
+    return _finish_text(store, key, _generate(system, user, temperature, json_mode=False))
+
+def chat_json(system: str, user: str, temperature: float = 0.2, cache: bool = True) -> Dict[str, Any]:
+    """
+    Ask for strict JSON. If parsing fails, return {}.
+    Only responses that parse are cached; cache=False skips the lookup.
+    """
+    store, key, hit = _cached("json", system, user, temperature, cache)
+    data = _cached_json(hit)
+    if data is not None:
+        return data
+    return _finish_json(store, key, _generate(system, user, temperature, json_mode=True).text)
+
+async def achat_text(system: str, user: str, temperature: float = 0.2, cache: bool = True) -> str:
+    """chat_text on genai's async client; safe to fan out with asyncio.gather."""
+    store, key, hit = _cached("text", system, user, temperature, cache)
+    if hit is not None:
+        return hit
+    return _finish_text(store, key, await _agenerate(system, user, temperature, json_mode=False))
+
+async def achat_json(system: str, user: str, temperature: float = 0.2, cache: bool = True) -> Dict[str, Any]:
+    store, key, hit = _cached("json", system, user, temperature, cache)
+    data = _cached_json(hit)
+    if data is not None:
+        return data
+    return _finish_json(store, key, (await _agenerate(system, user, temperature, json_mode=True)).text)
+
+def llm_cache_stats() -> Dict[str, Any]:
+    store = get_llm_cache()
+    return store.stats() if store is not None else {"enabled": False}
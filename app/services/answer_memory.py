@@ -0,0 +1,303 @@
+# app/services/answer_memory.py
+"""
+Answer memory: answers you approved (or reused and submitted), recalled when
+the same (or a near-identical) question comes up again for the same profile.
+
+Questions are normalized before fingerprinting: case, punctuation, "(required)"
+markers and the company name are folded away, so "Why do you want to work at
+Datadog?*" and "Why do you want to work at Stripe?" share one entry. Answers
+are stored with the company name replaced by {company} and filled back in on
+recall. Near matches must share every content word (see _near_match), and
+work-authorization / sponsorship questions are only ever recalled exactly.
+Only questions with no match go to the model; recalled answers can optionally
+get one cheap batched personalization pass.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import AnswerMemory
+from .tailoring import (
+    ANSWER_FALLBACK,
+    adraft_answers,
+    apersonalize_answers,
+    draft_answers,
+    personalize_answers,
+)
+
+COMPANY_SLOT = "{company}"
+
+# Only answers a person has vouched for are reused: approved via /qa/memory, or
+# recalled from memory and then submitted. Model drafts that were submitted
+# unreviewed are kept as "generated" (listed, approvable) but never recalled.
+RECALLABLE = ("approved", "submitted")
+
+_MARKERS = re.compile(r"\((?:required|optional)\)|\*", re.I)
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+
+
+def _company_pattern(company: str) -> Optional[re.Pattern]:
+    company = (company or "").strip()
+    if len(company) < 2:
+        return None
+    return re.compile(rf"(?<!\w){re.escape(company)}(?!\w)", re.I)
+
+
+def normalize_question(question: str, company: str = "") -> str:
+    text = _MARKERS.sub(" ", question or "")
+    pat = _company_pattern(company)
+    if pat is not None:
+        text = pat.sub(" company ", text)
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def _fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def question_fingerprint(question: str, company: str = "") -> str:
+    return _fingerprint(normalize_question(question, company))
+
+
+def _to_template(answer: str, company: str) -> str:
+    pat = _company_pattern(company)
+    return pat.sub(COMPANY_SLOT, answer) if pat is not None else answer
+
+
+def _from_template(answer: str, company: str) -> str:
+    return answer.replace(COMPANY_SLOT, company or "your company")
+
+
+# ---------- recall ----------
+# Near matches compare content words, not characters: grammar words are ignored,
+# interchangeable wording is canonicalized, and the questions may differ only in
+# "soft" words. Any other differing word (a country, language, number of years)
+# means a different question.
+_STOP = frozenset(
+    "a an and are as at be by can could did do does for from have how i if in is it its me my "
+    "of on or our please should that the their this to was we what when where which who why "
+    "will with would you your".split()
+)
+_CANON = {
+    "join": "work", "here": "company", "us": "company", "team": "company",
+    "organization": "company", "organisation": "company", "position": "role",
+    "job": "role", "opportunity": "role", "interested": "want",
+}
+_SOFT = frozenset(
+    "briefly describe tell explain share give provide about detail details example little more "
+    "some most".split()
+)
+# eligibility questions: a near miss (other country, visa type) must never be reused
+_EXACT_ONLY = re.compile(r"authori[sz]|sponsor|visa|permit|right to work|legally|citizen|clearance")
+
+
+def _content(norm: str) -> frozenset:
+    return frozenset(_CANON.get(t, t) for t in norm.split() if t not in _STOP)
+
+
+def _near_match(norm: str, rows: List[AnswerMemory]) -> Tuple[Optional[AnswerMemory], float]:
+    """Stored question with the same content words (up to soft words), scored by token overlap."""
+    if _EXACT_ONLY.search(norm):
+        return None, 0.0
+    words = _content(norm)
+    if not words:
+        return None, 0.0
+    best, best_score = None, 0.0
+    floor = settings.answer_memory_min_similarity
+    for row in rows:
+        if _EXACT_ONLY.search(row.question):
+            continue
+        other = _content(row.question)
+        if any(t not in _SOFT for t in words ^ other):
+            continue
+        score = len(words & other) / len(words | other)
+        if score >= floor and score > best_score:
+            best, best_score = row, score
+    return best, best_score
+
+
+def recall_answers(
+    db: Session,
+    profile_id: int,
+    questions: Iterable[str],
+    company: str = "",
+) -> Dict[str, Dict[str, Any]]:
+    """
+    {question: {"answer", "match": "exact"|"near", "score", "memory_id"}} for every
+    question memory can answer; unmatched questions are left out.
+    """
+    questions = list(questions)
+    if not settings.answer_memory_enabled or not questions:
+        return {}
+    rows = (
+        db.query(AnswerMemory)
+        .filter(AnswerMemory.profile_id == profile_id, AnswerMemory.source.in_(RECALLABLE))
+        .all()
+    )
+    if not rows:
+        return {}
+    by_fp = {r.fingerprint: r for r in rows}
+
+    out: Dict[str, Dict[str, Any]] = {}
+    used: Dict[int, AnswerMemory] = {}
+    for q in questions:
+        norm = normalize_question(q, company)
+        row = by_fp.get(_fingerprint(norm))
+        match, score = "exact", 1.0
+        if row is None:
+            row, score = _near_match(norm, rows)
+            match = "near"
+        if row is None:
+            continue
+        out[q] = {
+            "answer": _from_template(row.answer, company),
+            "match": match,
+            "score": round(score, 3),
+            "memory_id": row.id,
+        }
+        used[row.id] = row
+
+    for row in used.values():
+        row.uses = (row.uses or 0) + 1
+    if used:
+        db.commit()
+    return out
+
+
+# ---------- store ----------
+def remember_answers(
+    db: Session,
+    profile_id: int,
+    answers: Dict[str, str],
+    company: str = "",
+    source: str = "submitted",
+) -> int:
+    """
+    Upsert answers under `source` (latest wins per fingerprint); returns rows written.
+    A "generated" answer never replaces one that is already recallable.
+    """
+    if not settings.answer_memory_enabled:
+        return 0
+    now = datetime.utcnow()
+    written = 0
+    # labels that normalize alike ("Why us?" / "Why us? *") share one row; the
+    # session doesn't autoflush, so rows added in this call are tracked here
+    rows: Dict[str, Optional[AnswerMemory]] = {}
+    for q, a in answers.items():
+        a = (a or "").strip()
+        if not q or not a or a == ANSWER_FALLBACK:
+            continue
+        norm = normalize_question(q, company)
+        fp = _fingerprint(norm)
+        if fp not in rows:
+            rows[fp] = (
+                db.query(AnswerMemory)
+                .filter(AnswerMemory.profile_id == profile_id, AnswerMemory.fingerprint == fp)
+                .one_or_none()
+            )
+        row = rows[fp]
+        if row is None:
+            row = rows[fp] = AnswerMemory(
+                profile_id=profile_id, fingerprint=fp, question=norm, uses=0, created_at=now
+            )
+            db.add(row)
+        elif source not in RECALLABLE and row.source in RECALLABLE:
+            continue
+        row.answer = _to_template(a, company)
+        row.source = source
+        row.company = company or ""
+        row.updated_at = now
+        written += 1
+    if written:
+        db.commit()
+    return written
+
+
+def remember_submitted(
+    db: Session,
+    profile_id: int,
+    answers: Dict[str, str],
+    sources: Dict[str, str],
+    company: str = "",
+) -> int:
+    """After a submit: recalled answers stay "submitted"; fresh model drafts are stored as "generated"."""
+    recalled = {q: a for q, a in answers.items() if sources.get(q) in ("exact", "near")}
+    drafted = {q: a for q, a in answers.items() if q not in recalled}
+    return remember_answers(db, profile_id, recalled, company, source="submitted") + remember_answers(
+        db, profile_id, drafted, company, source="generated"
+    )
+
+
+# ---------- drafting ----------
+def _split(
+    db: Session, profile_id: int, questions: List[str], company: str
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    recalled = recall_answers(db, profile_id, questions, company)
+    return recalled, [q for q in questions if q not in recalled]
+
+
+def _merge(
+    questions: List[str],
+    recalled: Dict[str, str],
+    drafted: Dict[str, str],
+    matches: Dict[str, Dict[str, Any]],
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    answers = {q: recalled.get(q) or drafted.get(q) or ANSWER_FALLBACK for q in questions}
+    sources = {q: matches[q]["match"] if q in matches else "generated" for q in questions}
+    return answers, sources
+
+
+def draft_answers_with_memory(
+    db: Session,
+    profile_id: int,
+    questions: List[str],
+    profile: Dict[str, Any],
+    experience_bank: List[Dict[str, str]],
+    jd_text: str,
+    company: str = "",
+    role: str = "",
+    personalize: Optional[bool] = None,
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    (answers, sources): remembered answers first, draft_answers for the rest.
+    sources maps each question to "exact", "near" or "generated".
+    """
+    matches, missing = _split(db, profile_id, questions, company)
+    recalled = {q: m["answer"] for q, m in matches.items()}
+    if recalled and (settings.answer_memory_personalize if personalize is None else personalize):
+        recalled = personalize_answers(recalled, jd_text, company, role)
+    drafted = draft_answers(missing, profile, experience_bank, jd_text) if missing else {}
+    return _merge(questions, recalled, drafted, matches)
+
+
+async def adraft_answers_with_memory(
+    db: Session,
+    profile_id: int,
+    questions: List[str],
+    profile: Dict[str, Any],
+    experience_bank: List[Dict[str, str]],
+    jd_text: str,
+    company: str = "",
+    role: str = "",
+    personalize: Optional[bool] = None,
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """draft_answers_with_memory on the async client; personalization and drafting run concurrently."""
+    matches, missing = _split(db, profile_id, questions, company)
+    recalled = {q: m["answer"] for q, m in matches.items()}
+    personalize = settings.answer_memory_personalize if personalize is None else personalize
+
+    async def _recalled() -> Dict[str, str]:
+        return await apersonalize_answers(recalled, jd_text, company, role) if personalize else recalled
+
+    async def _drafted() -> Dict[str, str]:
+        return await adraft_answers(missing, profile, experience_bank, jd_text) if missing else {}
+
+    recalled, drafted = await asyncio.gather(_recalled(), _drafted())
+    return _merge(questions, recalled, drafted, matches)
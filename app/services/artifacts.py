@@ -0,0 +1,112 @@
+# app/services/artifacts.py
+"""
+Per-run debug artifacts (screenshots, Playwright traces) for connectors.
+
+Each submission gets its own folder under <doc_out_dir>/debug/<run_id>, so
+concurrent runs never clobber each other. Disk writes happen on a small
+background executor so the submit flow only pays for the capture itself,
+and a size/age retention policy keeps the debug folder bounded.
+"""
+from __future__ import annotations
+
+import shutil
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from ..config import settings
+
+_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="artifacts")
+
+
+def debug_root() -> Path:
+    return settings.doc_out_path / "debug"
+
+
+def new_run_id(prefix: str = "run") -> str:
+    return f"{prefix}_{time.strftime('%Y%m%d-%H%M%S')}_{uuid4().hex[:8]}"
+
+
+class ArtifactStore:
+    """Artifacts for one application run; file writes are queued off the caller's thread."""
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or new_run_id()
+        self.dir = debug_root() / self.run_id
+        self.files: Dict[str, str] = {}
+        self._pending: List[Future] = []
+
+    def path_for(self, name: str) -> Path:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        return self.dir / name
+
+    def write(self, name: str, data: bytes) -> str:
+        """Queue bytes for writing; returns the path they will land at."""
+        path = self.path_for(name)
+        self._pending.append(_writer.submit(path.write_bytes, data))
+        self.files[name] = str(path)
+        return str(path)
+
+    def add_file(self, name: str, path: Path) -> str:
+        """Register a file something else (e.g. tracing.stop) wrote into the run dir."""
+        self.files[name] = str(path)
+        return str(path)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        for fut in self._pending:
+            fut.result(timeout=timeout)
+        self._pending.clear()
+
+    def manifest(self) -> Dict[str, object]:
+        return {"run_id": self.run_id, "dir": str(self.dir), "files": dict(self.files)}
+
+
+def screenshot_options() -> Dict[str, object]:
+    """Compressed capture settings shared by the sync and async connectors."""
+    return {
+        "type": "jpeg",
+        "quality": settings.debug_screenshot_quality,
+        "full_page": settings.debug_full_page_screenshots,
+    }
+
+
+# ---------- retention ----------
+def _dir_size(p: Path) -> int:
+    return sum(f.stat().st_size for f in p.rglob("*") if f.is_file())
+
+
+def prune_artifacts(
+    max_total_mb: Optional[float] = None,
+    max_age_days: Optional[float] = None,
+) -> Dict[str, int]:
+    """Delete run folders older than max_age_days, then oldest-first until under max_total_mb."""
+    root = debug_root()
+    if not root.exists():
+        return {"removed": 0, "kept": 0}
+    max_total = (settings.debug_artifacts_max_mb if max_total_mb is None else max_total_mb) * 1024 * 1024
+    max_age = (settings.debug_artifacts_max_age_days if max_age_days is None else max_age_days) * 86400
+
+    runs = []
+    for d in root.iterdir():
+        if d.is_dir():
+            try:
+                runs.append((d.stat().st_mtime, _dir_size(d), d))
+            except OSError:
+                continue
+    runs.sort()  # oldest first
+
+    now = time.time()
+    removed = 0
+    total = sum(size for _, size, _ in runs)
+    for mtime, size, d in runs:
+        if now - mtime > max_age or total > max_total:
+            shutil.rmtree(d, ignore_errors=True)
+            total -= size
+            removed += 1
+    return {"removed": removed, "kept": len(runs) - removed}
+
+
+def prune_artifacts_in_background() -> None:
+    _writer.submit(prune_artifacts)
@@ -3,20 +3,27 @@ from __future__ import annotations
 
 import asyncio
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
 from typing import Any, Dict, List, Optional
-from uuid import uuid4
 
 from sqlalchemy.orm import Session
 
 from ..config import settings
-from ..models import Application, Job, Profile, QABank
-from .doc_gen import html_to_pdf, render_resume_html
-from .jd_parser import fetch_job_details
-from .tailoring import draft_answers, generate_resume_context, standard_answers
-from .connectors.greenhouse import collect_questions, submit_greenhouse
+from ..models import Application, Job, Profile
+from .ai import llm_cache_stats
+from .doc_gen import html_to_pdf_batch_async
+from .jd_digest import build_jd_digests, job_jd_text, store_jd_digests
+from .qa_index import relevant_experience
+from .packages import attach_package, build_package, package_docs, package_result
+from .answer_memory import draft_answers_with_memory, remember_submitted
+from .tailoring import agenerate_package_context, standard_answers
+from .connectors.greenhouse import FormSession
+from .form_cache import form_entry_url, fresh_form_schema, schema_questions, store_form_schema
+from .sources.greenhouse import fetch_greenhouse_questions_sync
 from .tracker import log_leads_to_excel, log_to_excel
+from ..utils.browser import shutdown_async_browser_pools
+from ..utils.http import close_http_client
 
 
 # ---------- helpers ----------
@@ -43,31 +50,96 @@ def _profile_dict(prof: Profile) -> Dict[str, Any]:
     }
 
 
-def _make_resume(
+def _make_package(
     profile: Dict[str, Any],
+    job: Job,
     jd_text: str,
     exp_bank: List[Dict[str, str]],
     resume_mode: str,
     static_path: Optional[str],
-) -> str:
-    """Return a PDF path (uses static path or generates AI resume)."""
+) -> Dict[str, Any]:
+    """Return {resume_pdf, cover_pdf}: the static resume, or an AI resume + cover letter."""
     if resume_mode == "static" and static_path:
-        return static_path
-    ctx = generate_resume_context(profile, jd_text, exp_bank)
-    out = Path(settings.doc_out_dir) / f"resume_{uuid4().hex}.pdf"
-    html = render_resume_html(ctx)
-    html_to_pdf(html, str(out))
-    return str(out)
+        return {"resume_pdf": static_path, "cover_pdf": None}
+    return build_package(profile, jd_text, exp_bank, job.company or "", job.title or "")
+
+
+def _prefetch_jd_texts(db: Session, jobs: List[Job]) -> Dict[int, str]:
+    """Digest every job lacking a fresh JD digest concurrently; returns prompt text per job."""
+    try:
+        digests = _run_async_safely(build_jd_digests(jobs, db))
+    except Exception:
+        digests = {}
+    return store_jd_digests(db, jobs, digests)
+
+
+def _prerender_packages(
+    jobs: List[Job],
+    profile: Dict[str, Any],
+    jd_texts: Dict[int, str],
+    exp_banks: Dict[int, List[Dict[str, str]]],
+) -> Dict[int, Dict[str, Any]]:
+    """
+    AI mode: tailor every resume + cover letter concurrently (bounded by the
+    LLM limiter), then render them all on PDF_BATCH_CONCURRENCY pages of one
+    browser lease. The async browser pool lives only for this batch's loop.
+    """
+    async def _all():
+        contexts = await asyncio.gather(
+            *(
+                agenerate_package_context(
+                    profile, jd_texts.get(j.id, ""), exp_banks[j.id], j.company or "", j.title or ""
+                )
+                for j in jobs
+            ),
+            return_exceptions=True,
+        )
+        docs, ids = [], []
+        for j, ctxs in zip(jobs, contexts):
+            if isinstance(ctxs, BaseException):
+                continue  # the per-job loop retries via _make_package
+            docs.extend(package_docs(ctxs))
+            ids.append(j.id)
+        if not docs:
+            return [], []
+        try:
+            return ids, await html_to_pdf_batch_async(docs, concurrency=settings.pdf_batch_concurrency)
+        finally:
+            await shutdown_async_browser_pools()
+
+    try:
+        ids, rendered = _run_async_safely(_all())
+    except Exception:
+        return {}
+    out: Dict[int, Dict[str, Any]] = {}
+    for n, jid in enumerate(ids):
+        try:
+            out[jid] = package_result(rendered[2 * n : 2 * n + 2])
+        except RuntimeError:
+            continue
+    return out
+
+
+async def _closing_http(coro):
+    """Run coro, then close the loop's pooled HTTP client (the loop ends with asyncio.run)."""
+    try:
+        return await coro
+    finally:
+        await close_http_client()
 
 
 def _run_async_safely(coro):
-    """Run an async coroutine from sync code; handle already-running loop."""
+    """
+    Run an async coroutine from sync code on a fresh loop. Errors raised by the
+    coroutine propagate unchanged; if this thread already runs a loop, the
+    coroutine gets its own loop on a helper thread instead.
+    """
     try:
-        return asyncio.run(coro)
+        asyncio.get_running_loop()
     except RuntimeError:
-        # If an event loop is already running (rare in this sync context)
-        loop = asyncio.get_event_loop()
-        return loop.run_until_complete(coro)
+        return asyncio.run(_closing_http(coro))
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, _closing_http(coro)).result()
 
 
 # ---------- batch engine ----------
@@ -79,6 +151,7 @@ def run_batch_apply(
     resume_mode: str = "static",  # "static" or "ai"
     submit: bool = True,
     delay_seconds: float = 3.0,
+    qa_pack_id: str = "default",
 ) -> Dict[str, Any]:
     """
     Pick N unapplied jobs and (preview -> optionally submit) each.
@@ -90,10 +163,6 @@ def run_batch_apply(
 
     profile = _profile_dict(prof)
 
-    # Experience/QABank
-    qa_rows = db.query(QABank).all()
-    exp_bank = [{"base_answer": r.base_answer, "tags": r.tags} for r in qa_rows]
-
     # Choose jobs
     jobs = _pick_jobs(db, limit=limit, only_unapplied=True)
     if not jobs:
@@ -111,6 +180,13 @@ def run_batch_apply(
     ]
     leads_xlsx = log_leads_to_excel("leads.xlsx", leads_rows)
 
+    jd_texts = _prefetch_jd_texts(db, jobs)
+    # Experience/QABank: per job, only the pack's rows relevant to its JD
+    exp_banks = {
+        j.id: relevant_experience(db, qa_pack_id, jd_text=jd_texts.get(j.id, "")) for j in jobs
+    }
+    packages = _prerender_packages(jobs, profile, jd_texts, exp_banks) if resume_mode == "ai" else {}
+
     results: List[Dict[str, Any]] = []
     for j in jobs:
         entry: Dict[str, Any] = {
@@ -120,52 +196,78 @@ def run_batch_apply(
             "url": j.url,
         }
         try:
-            # JD → text
-            try:
-                jd_details = _run_async_safely(fetch_job_details(j.url))
-            except Exception:
-                jd_details = {}
-            jd_text = (jd_details or {}).get("jd_text", "")
-
-            # Resume
-            resume_pdf = _make_resume(
-                profile, jd_text, exp_bank, resume_mode, prof.resume_path
+            # JD digest (prefetched above; retry here if that fetch failed)
+            jd_text = jd_texts.get(j.id)
+            if jd_text is None:
+                try:
+                    jd_text = _run_async_safely(job_jd_text(db, j))
+                except Exception:
+                    jd_text = ""
+            exp_bank = exp_banks[j.id] if j.id in jd_texts else relevant_experience(db, qa_pack_id, jd_text=jd_text)
+
+            # Resume + cover letter (pre-rendered in AI mode)
+            package = packages.get(j.id) or _make_package(
+                profile, j, jd_text, exp_bank, resume_mode, prof.resume_path
             )
+            resume_pdf = package["resume_pdf"]
             entry["resume_pdf"] = resume_pdf
+            entry["cover_letter_pdf"] = package.get("cover_pdf")
 
-            # Questions + AI answers
-            if j.ats_type == "greenhouse":
-                questions = collect_questions(j.url, j.company or "")
-            else:
-                questions = []
-            answers = draft_answers(questions, profile, exp_bank, jd_text)
-            entry["found_questions"] = questions
-            entry["draft_answers"] = answers
+            # Questions + AI answers (form page stays open while the LLM drafts)
+            session: Optional[FormSession] = None
+            try:
+                schema = fresh_form_schema(j) if j.ats_type == "greenhouse" else None
+                if j.ats_type == "greenhouse" and schema is None and not submit:
+                    api_fields = fetch_greenhouse_questions_sync(j.url, j.company or "")
+                    if api_fields:
+                        store_form_schema(db, j, "", api_fields, source="api")
+                        schema = j.fields_schema
+                if j.ats_type == "greenhouse" and (submit or schema is None):
+                    session = FormSession(
+                        form_entry_url(j), j.company or "", headless=True if not submit else None
+                    )
+                    store_form_schema(db, j, session.form_url, session.fields)
+                    questions = session.questions
+                elif schema is not None:
+                    questions = schema_questions(schema)  # preview from cache, no browser
+                else:
+                    questions = []
+                answer_bank = relevant_experience(db, qa_pack_id, jd_text=jd_text, questions=questions)
+                answers, answer_sources = draft_answers_with_memory(
+                    db, prof.id, questions, profile, answer_bank, jd_text,
+                    company=j.company or "", role=j.title or "",
+                )
+                entry["found_questions"] = questions
+                entry["draft_answers"] = answers
+                entry["answer_sources"] = answer_sources
 
-            # Structured fields
-            std = standard_answers(profile)
+                # Structured fields
+                std = standard_answers(profile)
 
-            if submit:
-                if j.ats_type != "greenhouse":
-                    raise RuntimeError(f"ATS {j.ats_type} not supported yet")
+                if submit:
+                    if session is None:
+                        raise RuntimeError(f"ATS {j.ats_type} not supported yet")
+                    confirmation, _dbg = session.submit(std, resume_pdf, answers)
+            finally:
+                if session is not None:
+                    session.close()
 
-                confirmation = submit_greenhouse(
-                    j.url, std, resume_pdf, answers, j.company or ""
-                )
+            if submit:
                 entry["confirmation"] = confirmation or ""
 
                 # Persist application row
                 app_row = Application(
                     job_id=j.id,
                     profile_id=prof.id,
-                    qa_pack_id="default",
+                    qa_pack_id=qa_pack_id,
                     status="submitted",
                     confirmation_number=confirmation,
                     submitted_at=datetime.utcnow(),
-                    resume_version=("static" if resume_mode == "static" else "ai-v1"),
                 )
+                attach_package(app_row, package, resume_default="static")
                 db.add(app_row)
                 db.commit()
+                remember_submitted(db, prof.id, answers, answer_sources, company=j.company or "")
 
                 # Excel tracker
                 xlsx = log_to_excel(
@@ -200,10 +302,16 @@ def run_batch_apply(
             time.sleep(1.0)
 
     ok = any(r.get("status") in {"previewed", "submitted"} for r in results)
+    answer_memory: Dict[str, int] = {"exact": 0, "near": 0, "generated": 0}
+    for r in results:
+        for src in (r.get("answer_sources") or {}).values():
+            answer_memory[src] = answer_memory.get(src, 0) + 1
     return {
         "ok": ok,
         "picked": len(jobs),
         "submit": submit,
         "leads_xlsx": leads_xlsx,
+        "llm_cache": llm_cache_stats(),
+        "answer_memory": answer_memory,
         "results": results,
     }
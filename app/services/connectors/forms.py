@@ -0,0 +1,268 @@
+# app/services/connectors/forms.py
+"""
+ATS-agnostic form helpers that run inside the page.
+
+Each helper is one injected script, so a whole form is described in a
+single Playwright round trip instead of several IPC calls per element.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List
+
+# Field descriptor (one per input / textarea / select / radio group):
+#   kind      "text" | "email" | "tel" | "textarea" | "select" | "multiselect"
+#             | "radio" | "checkbox" | "file" | other <input type>
+#   name, id  raw attributes ("" if missing)
+#   label     aria-label → placeholder → associated <label> text
+#   required  bool
+#   options   [{"value", "label"}] for selects and radio groups, else []
+#   selector  CSS selector that matches exactly this field (radio: the group)
+#   visible   rendered with a non-empty box
+DISCOVER_FIELDS_JS = r"""
+() => {
+  const clean = (t) => (t || '').replace(/\s+/g, ' ').trim();
+  const q = (v) => v.replace(/(["\\])/g, '\\$1');
+  const visible = (el) => {
+    if (!el.getClientRects().length) return false;
+    const st = getComputedStyle(el);
+    return st.visibility !== 'hidden' && st.display !== 'none';
+  };
+  const domLabel = (el) => {
+    if (el.labels && el.labels.length) return el.labels[0].innerText;
+    const wrap = el.closest('label');
+    if (wrap) return wrap.innerText;
+    let prev = el.previousElementSibling;
+    while (prev) {
+      if (prev.tagName && prev.tagName.toLowerCase() === 'label') return prev.innerText;
+      prev = prev.previousElementSibling;
+    }
+    const fs = el.closest('fieldset');
+    if (fs) {
+      const lg = fs.querySelector('legend');
+      if (lg) return lg.innerText;
+    }
+    const c = el.closest('div,section,li,fieldset');
+    if (c) {
+      const any = c.querySelector('label');
+      if (any) return any.innerText;
+    }
+    return '';
+  };
+  const labelFor = (el) =>
+    clean(el.getAttribute('aria-label') || el.getAttribute('placeholder') || domLabel(el));
+  let seq = 0;
+  const selectorFor = (el) => {
+    const tag = el.tagName.toLowerCase();
+    const id = el.getAttribute('id');
+    if (id && window.CSS && CSS.escape) {
+      const sel = '#' + CSS.escape(id);
+      if (document.querySelectorAll(sel).length === 1) return sel;
+    }
+    const name = el.getAttribute('name');
+    if (name) {
+      const sel = `${tag}[name="${q(name)}"]`;
+      if (document.querySelectorAll(sel).length === 1) return sel;
+    }
+    const mark = String(seq++);
+    el.setAttribute('data-ap-field', mark);
+    return `[data-ap-field="${mark}"]`;
+  };
+  const isRequired = (el, label) =>
+    !!(el.required || el.getAttribute('aria-required') === 'true' || /\*\s*$/.test(label));
+
+  const out = [];
+  const radios = new Map();
+  const skip = new Set(['hidden', 'submit', 'button', 'reset', 'image']);
+  for (const el of document.querySelectorAll('input, textarea, select')) {
+    const tag = el.tagName.toLowerCase();
+    const type = (el.getAttribute('type') || 'text').toLowerCase();
+    if (tag === 'input' && skip.has(type)) continue;
+
+    if (tag === 'input' && type === 'radio') {
+      const name = el.getAttribute('name') || '';
+      let group = radios.get(name);
+      if (!group) {
+        const fs = el.closest('fieldset');
+        const lg = fs && fs.querySelector('legend');
+        group = {
+          kind: 'radio', name, id: el.getAttribute('id') || '',
+          label: clean(lg ? lg.innerText : el.getAttribute('aria-label') || ''),
+          required: false, options: [],
+          selector: name ? `input[type="radio"][name="${q(name)}"]` : selectorFor(el),
+          visible: false,
+        };
+        radios.set(name, group);
+        out.push(group);
+      }
+      group.options.push({ value: el.value, label: clean(domLabel(el)) });
+      group.required = group.required || el.required;
+      group.visible = group.visible || visible(el);
+      continue;
+    }
+
+    const label = labelFor(el);
+    let kind = tag === 'input' ? type : tag;
+    if (tag === 'select' && el.multiple) kind = 'multiselect';
+    const options = tag === 'select'
+      ? Array.from(el.options).map((o) => ({ value: o.value, label: clean(o.text) }))
+      : [];
+    out.push({
+      kind, name: el.getAttribute('name') || '', id: el.getAttribute('id') || '',
+      label, required: isRequired(el, label), options,
+      selector: selectorFor(el), visible: visible(el),
+    });
+  }
+  return out;
+}
+"""
+
+
+def discover_fields(page) -> List[Dict[str, Any]]:
+    """Describe every form field on the page in a single page.evaluate."""
+    try:
+        return page.evaluate(DISCOVER_FIELDS_JS) or []
+    except Exception:
+        return []
+
+
+async def discover_fields_async(page) -> List[Dict[str, Any]]:
+    """discover_fields for a playwright.async_api Page."""
+    try:
+        return await page.evaluate(DISCOVER_FIELDS_JS) or []
+    except Exception:
+        return []
+
+
+def long_answer_fields(fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Visible <textarea> descriptors, in page order."""
+    return [f for f in fields if f.get("kind") == "textarea" and f.get("visible")]
+
+
+def normalize_key(key: str) -> str:
+    """Compare question labels loosely: case, whitespace, trailing required '*'."""
+    key = re.sub(r"\s+", " ", key or "").strip()
+    return re.sub(r"\s*\*$", "", key).lower()
+
+
+def question_keys(fields: List[Dict[str, Any]]) -> List[str]:
+    """Answer keys for the long-answer prompts (label, else question_N)."""
+    return [
+        (f.get("label") or "").strip() or f"question_{i+1}"
+        for i, f in enumerate(long_answer_fields(fields))
+    ]
+
+
+# Sets every {selector: value} in one pass. Uses the native value setter and
+# fires input/change so React-controlled ATS forms register the change.
+# Returns {selector: "ok" | "missing" | "mismatch" | "unsupported"}.
+BULK_FILL_JS = r"""
+(values) => {
+  const setNative = (el, v) => {
+    const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+      : el instanceof HTMLSelectElement ? HTMLSelectElement.prototype
+      : HTMLInputElement.prototype;
+    const desc = Object.getOwnPropertyDescriptor(proto, 'value');
+    if (desc && desc.set) desc.set.call(el, v); else el.value = v;
+  };
+  const fire = (el) => {
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+  };
+  const out = {};
+  for (const [sel, v] of Object.entries(values)) {
+    let el = null;
+    try { el = document.querySelector(sel); } catch (e) { el = null; }
+    if (!el) { out[sel] = 'missing'; continue; }
+    if (el.isContentEditable) {
+      el.focus();
+      el.innerText = v;
+      el.dispatchEvent(new InputEvent('input', { bubbles: true }));
+      out[sel] = el.innerText.trim() === String(v).trim() ? 'ok' : 'mismatch';
+      continue;
+    }
+    const tag = el.tagName.toLowerCase();
+    const type = (el.getAttribute('type') || '').toLowerCase();
+    if (!['input', 'textarea', 'select'].includes(tag) || ['file', 'checkbox', 'radio'].includes(type)) {
+      out[sel] = 'unsupported';
+      continue;
+    }
+    el.focus();
+    setNative(el, v);
+    fire(el);
+    el.blur();
+    out[sel] = el.value === String(v) ? 'ok' : 'mismatch';
+  }
+  return out;
+}
+"""
+
+
+def bulk_fill(page, values: Dict[str, str]) -> Dict[str, str]:
+    """
+    Fill {selector: value} in one page.evaluate, then fall back to
+    Playwright fill / typing only for fields that failed verification.
+    Returns {selector: "ok" | "fallback" | "typed" | "error"}.
+    """
+    values = {sel: v for sel, v in values.items() if v}
+    if not values:
+        return {}
+    try:
+        status: Dict[str, str] = page.evaluate(BULK_FILL_JS, values) or {}
+    except Exception:
+        status = {}
+
+    result: Dict[str, str] = {}
+    for sel, val in values.items():
+        st = status.get(sel)
+        if st == "ok":
+            result[sel] = "ok"
+            continue
+        if st == "missing":
+            result[sel] = "error"
+            continue
+        loc = page.locator(sel).first
+        try:
+            loc.fill(val)
+            result[sel] = "fallback"
+        except Exception:
+            try:
+                loc.click()
+                page.keyboard.type(val)
+                result[sel] = "typed"
+            except Exception:
+                result[sel] = "error"
+    return result
+
+
+async def bulk_fill_async(page, values: Dict[str, str]) -> Dict[str, str]:
+    """bulk_fill for a playwright.async_api Page."""
+    values = {sel: v for sel, v in values.items() if v}
+    if not values:
+        return {}
+    try:
+        status: Dict[str, str] = await page.evaluate(BULK_FILL_JS, values) or {}
+    except Exception:
+        status = {}
+
+    result: Dict[str, str] = {}
+    for sel, val in values.items():
+        st = status.get(sel)
+        if st == "ok":
+            result[sel] = "ok"
+            continue
+        if st == "missing":
+            result[sel] = "error"
+            continue
+        loc = page.locator(sel).first
+        try:
+            await loc.fill(val)
+            result[sel] = "fallback"
+        except Exception:
+            try:
+                await loc.click()
+                await page.keyboard.type(val)
+                result[sel] = "typed"
+            except Exception:
+                result[sel] = "error"
+    return result
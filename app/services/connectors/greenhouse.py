@@ -1,15 +1,19 @@
 # app/services/connectors/greenhouse.py
 from __future__ import annotations
 
-from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 
-# Type-only import is fine (lightweight); we import sync_playwright inside functions
-from playwright.sync_api import Page
+# Type-only import is fine (lightweight); browsers come from the shared pool
+from playwright.sync_api import BrowserContext, Page
 
-from ..winloop import run_playwright
-from config import settings
+from ...config import settings
+from ...utils.browser import get_browser_pool
+from ..artifacts import ArtifactStore, prune_artifacts_in_background, screenshot_options
+from .routing import install_route_policy
+from .forms import bulk_fill, discover_fields, long_answer_fields, normalize_key, question_keys
+from ..sources.greenhouse import fetch_greenhouse_questions_sync
+from .waits import CONFIRMATION_SELECTOR, SubmitWatcher, WaitLog, wait_for_fields
 
 
 # ---------- URL helpers ----------
@@ -66,62 +70,6 @@ def _goto_greenhouse_form(page: Page, url: str, company_slug: Optional[str]) ->
 _BASIC_KEYS = {"first name", "last name", "email", "phone", "resume", "cv"}
 
 
-def _label_for_textarea(page: Page, ta_locator) -> str:
-    """Best-effort label for a <textarea>."""
-    try:
-        txt = ta_locator.get_attribute("aria-label") or ta_locator.get_attribute("placeholder")
-        if txt:
-            return txt.strip()
-    except Exception:
-        pass
-
-    # try various DOM relationships for a nearby label
-    try:
-        lab = ta_locator.evaluate(
-            """
-            (el) => {
-              const id = el.getAttribute('id');
-              if (id) {
-                const byFor = document.querySelector(`label[for="${id}"]`);
-                if (byFor) return byFor.innerText;
-              }
-              const wrap = el.closest('label');
-              if (wrap) return wrap.innerText;
-
-              let prev = el.previousElementSibling;
-              while (prev) {
-                if (prev.tagName && prev.tagName.toLowerCase() === 'label') return prev.innerText;
-                prev = prev.previousElementSibling;
-              }
-              const c = el.closest('div,section,li,fieldset');
-              if (c) {
-                const any = c.querySelector('label');
-                if (any) return any.innerText;
-              }
-              return "";
-            }
-            """
-        )
-        return (lab or "").strip()
-    except Exception:
-        return ""
-
-
-def _visible_textarea_keys(page: Page) -> List[str]:
-    """Return keys for each visible <textarea> in order."""
-    out: List[str] = []
-    tas = page.locator("textarea:visible")
-    for i in range(tas.count()):
-        ta = tas.nth(i)
-        key = (ta.get_attribute("aria-label") or ta.get_attribute("placeholder") or "").strip()
-        if not key:
-            key = _label_for_textarea(page, ta)
-        if not key:
-            key = f"question_{i+1}"
-        out.append(key)
-    return out
-
-
 def _fill_contenteditable(page: Page, sel: str, text: str) -> bool:
     """Best-effort fill for rich-text editors."""
     loc = page.locator(f"{sel}:visible")
@@ -138,27 +86,266 @@ def _fill_contenteditable(page: Page, sel: str, text: str) -> bool:
         return False
 
 
+# ---------- fill plan (shared with greenhouse_async) ----------
+SUBMIT_SELECTORS = [
+    'button:has-text("Submit")', 'button:has-text("Apply")',
+    'button[type="submit"]', 'input[type="submit"]',
+]
+
+
+def _fill_values(
+    fields: List[Dict], std: Dict[str, str], custom_answers: Dict[str, str]
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Return ({selector: value}, {textarea selector: question key})."""
+    values: Dict[str, str] = {
+        'input[name*="first_name" i]': std.get("first_name") or "",
+        'input[name*="last_name" i]':  std.get("last_name") or "",
+        'input[type="email"]':          std.get("email") or "",
+        'input[type="tel"]':            std.get("phone") or "",
+    }
+    # answers may be keyed by API labels or DOM labels ("Why us? *")
+    loose = {normalize_key(k): v for k, v in custom_answers.items()}
+    answer_keys: Dict[str, str] = {}
+    for field, key in zip(long_answer_fields(fields), question_keys(fields)):
+        val = (custom_answers.get(key) or loose.get(normalize_key(key)) or "").strip()
+        if not val:
+            # keep test forms non-empty so you can see it working
+            val = f"{std.get('first_name','I')} have relevant experience for \"{key}\". Happy to discuss in detail."
+        values[field["selector"]] = val
+        answer_keys[field["selector"]] = key
+    return values, answer_keys
+
+
+def _filled_report(
+    status: Dict[str, str], values: Dict[str, str], answer_keys: Dict[str, str]
+) -> List[Dict]:
+    filled: List[Dict] = []
+    for sel, key in answer_keys.items():
+        st = status.get(sel, "error")
+        if st == "error":
+            filled.append({"key": key, "error": "could_not_fill"})
+        else:
+            entry = {"key": key, "chars": len(values[sel])}
+            if st != "ok":
+                entry[st] = True
+            filled.append(entry)
+    return filled
+
+
+def _submit_failed(info: Dict) -> bool:
+    """No outcome signal, or the application POST was rejected."""
+    return info.get("submit_signal") is None or (info.get("post_status") or 0) >= 400
+
+
+# ---------- page steps ----------
+def _capture(pg: Page, artifacts: ArtifactStore, name: str, shots: Dict[str, str], key: str) -> None:
+    """Compressed screenshot; only the capture is on this thread, the write is queued."""
+    try:
+        shots[key] = artifacts.write(name, pg.screenshot(**screenshot_options()))
+    except Exception:
+        pass
+
+
+def _load_form(pg: Page, app_url: str, company_slug: Optional[str], waits: WaitLog) -> List[Dict]:
+    """Navigate to the form once and return its field descriptors."""
+    with waits.step("goto"):
+        _goto_greenhouse_form(pg, app_url, company_slug)
+    with waits.step("fields_attached"):
+        wait_for_fields(pg)
+    with waits.step("discover"):
+        return discover_fields(pg)
+
+
+def _fill_and_submit(
+    pg: Page,
+    fields: List[Dict],
+    std: Dict[str, str],
+    resume_pdf: str,
+    custom_answers: Dict[str, str],
+    artifacts: Optional[ArtifactStore],
+    waits: WaitLog,
+) -> Tuple[str, Dict]:
+    shots: Dict[str, str] = {}
+
+    # upload resume if input present
+    with waits.step("upload"):
+        if pg.locator('input[type="file"]').count():
+            try:
+                pg.set_input_files('input[type="file"]', resume_pdf)
+            except Exception:
+                pass
+
+    # standard fields + long-answer textareas, set in one bulk call
+    values, answer_keys = _fill_values(fields, std, custom_answers)
+    with waits.step("fill"):
+        status = bulk_fill(pg, values)
+    filled = _filled_report(status, values, answer_keys)
+
+    if artifacts is not None:
+        _capture(pg, artifacts, "before_submit.jpg", shots, "before")
+
+    # submit, then wait for the first concrete outcome signal
+    submitted = False
+    signal = None
+    watcher = SubmitWatcher(pg)
+    for sel in SUBMIT_SELECTORS:
+        if pg.locator(sel).count():
+            try:
+                pg.click(sel)
+                submitted = True
+            except Exception:
+                pass
+            break
+
+    if submitted:
+        with waits.step("submit_outcome"):
+            signal = watcher.wait(timeout_ms=15000)
+
+    if artifacts is not None:
+        _capture(pg, artifacts, "after_submit.jpg", shots, "after")
+
+    # best-effort confirmation
+    conf_txt = ""
+    try:
+        el = pg.locator(CONFIRMATION_SELECTOR).first
+        if el and el.is_visible():
+            conf_txt = (el.text_content() or "").strip()
+    except Exception:
+        pass
+
+    return conf_txt, {
+        "filled": filled,
+        "shots": shots,
+        "submit_signal": signal,
+        "post_status": watcher.post_status,
+        "waits": waits.steps,
+    }
+
+
+# ---------- form session ----------
+class FormSession:
+    """
+    One Greenhouse form on one pooled page: navigate once, expose the
+    discovered fields and questions, then fill + submit on that same page.
+
+    The page stays open (holding a pooled browser) until close(), so the
+    caller can draft answers in between without a second page load.
+    """
+
+    def __init__(
+        self,
+        app_url: str,
+        company_slug: Optional[str] = None,
+        headless: Optional[bool] = None,
+        debug: bool = False,
+        run_id: Optional[str] = None,
+    ):
+        if headless is None:
+            headless = bool(getattr(settings, "playwright_headless", True))
+        self.app_url = app_url
+        self.company_slug = company_slug
+        # debug: per-run screenshots, plus a trace kept only if the submit fails
+        self.artifacts = ArtifactStore(run_id) if debug else None
+        self._tracing = False
+        self.form_url = ""
+        self.fields: List[Dict] = []
+        self.questions: List[str] = []
+        self._page: Optional[Page] = None
+        self._route_stats = None
+        self.waits = WaitLog()
+        self._lease = get_browser_pool(headless=headless).lease()
+        try:
+            self.fields = self._lease.call(self._open)
+            self.questions = question_keys(self.fields)
+        except BaseException:
+            self._stop_trace(failed=True)
+            self._lease.close()
+            raise
+
+    def _open(self, ctx: BrowserContext) -> List[Dict]:
+        self._route_stats = install_route_policy(ctx)
+        if self.artifacts is not None and settings.debug_traces:
+            ctx.tracing.start(screenshots=True, snapshots=True)
+            self._tracing = True
+        self._page = ctx.new_page()
+        fields = _load_form(self._page, self.app_url, self.company_slug, self.waits)
+        self.form_url = self._page.url
+        return fields
+
+    def submit(
+        self,
+        std: Dict[str, str],
+        resume_pdf: str,
+        custom_answers: Dict[str, str],
+        debug: Optional[bool] = None,
+    ) -> Tuple[str, Dict]:
+        """Fill the already-loaded form and submit it. Returns (confirmation_text, debug_info)."""
+        pg = self._page
+        if pg is None:
+            raise RuntimeError("form session is not open")
+        if debug and self.artifacts is None:
+            self.artifacts = ArtifactStore()  # screenshots only; tracing starts at open
+        store = self.artifacts if debug is not False else None
+        try:
+            conf_txt, info = self._lease.call(
+                lambda _ctx: _fill_and_submit(pg, self.fields, std, resume_pdf, custom_answers, store, self.waits)
+            )
+        except BaseException:
+            self._stop_trace(failed=True)
+            raise
+        self._stop_trace(failed=_submit_failed(info))
+        info["blocked"] = self.blocked()
+        if store is not None:
+            info["artifacts"] = store.manifest()
+            prune_artifacts_in_background()
+        return conf_txt, info
+
+    def _stop_trace(self, failed: bool) -> None:
+        """Keep the trace zip on failure, discard it otherwise."""
+        if not self._tracing:
+            return
+        self._tracing = False
+        store = self.artifacts
+        try:
+            if failed and store is not None:
+                path = store.path_for("trace.zip")
+                self._lease.call(lambda ctx: ctx.tracing.stop(path=str(path)))
+                store.add_file("trace.zip", path)
+            else:
+                self._lease.call(lambda ctx: ctx.tracing.stop())
+        except Exception:
+            pass
+
+    def blocked(self) -> Dict:
+        """Blocked-request counts and estimated bytes saved for this session's pages."""
+        stats = self._route_stats
+        if stats is None:
+            return {}
+        return self._lease.call(lambda _ctx: stats.report())
+
+    def close(self) -> None:
+        self._stop_trace(failed=False)
+        self._page = None
+        self._lease.close()
+
+    def __enter__(self) -> "FormSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
 # ---------- public API ----------
 def collect_questions(app_url: str, company_slug: Optional[str] = None) -> List[str]:
     """
     Return ONLY long-answer prompts (for visible <textarea> elements).
+    Tries the boards JSON API first; falls back to loading the form.
     """
-    def _impl():
-        from playwright.sync_api import sync_playwright
-        with sync_playwright() as p:
-            b = p.chromium.launch(headless=True)
-            pg = b.new_page()
-            _goto_greenhouse_form(pg, app_url, company_slug)
-            pg.wait_for_load_state("networkidle")
-            try:
-                pg.wait_for_selector("textarea, input, label", timeout=5000)
-            except Exception:
-                pass
-            keys = _visible_textarea_keys(pg)
-            b.close()
-            return keys
-
-    return run_playwright(_impl)
+    fields = fetch_greenhouse_questions_sync(app_url, company_slug)
+    if fields:
+        return question_keys(fields)
+    with FormSession(app_url, company_slug, headless=True) as session:
+        return session.questions
 
 
 def submit_greenhouse(
@@ -173,113 +360,5 @@ def submit_greenhouse(
     Upload resume, fill standard fields, answer long-form questions, submit.
     Returns (confirmation_text, debug_info).
     """
-    def _impl():
-        from playwright.sync_api import sync_playwright
-        headless = bool(getattr(settings, "playwright_headless", True))
-
-        debug_dir = Path(getattr(settings, "doc_out_dir", "storage/docs")) / "debug"
-        debug_dir.mkdir(parents=True, exist_ok=True)
-        shots: Dict[str, str] = {}
-        filled: List[Dict] = []
-
-        with sync_playwright() as p:
-            b = p.chromium.launch(headless=headless)
-            pg = b.new_page()
-            _goto_greenhouse_form(pg, app_url, company_slug)
-            pg.wait_for_load_state("domcontentloaded")
-
-            # upload resume if input present
-            if pg.locator('input[type="file"]').count():
-                try:
-                    pg.set_input_files('input[type="file"]', resume_pdf)
-                except Exception:
-                    pass
-
-            # basic fields helper
-            def fill(sel: str, val: Optional[str]):
-                if not val:
-                    return
-                loc = pg.locator(sel)
-                if loc.count():
-                    try:
-                        loc.first.fill(val)
-                    except Exception:
-                        try:
-                            loc.first.click()
-                            pg.keyboard.type(val)
-                        except Exception:
-                            pass
-
-            fill('input[name*="first_name" i]', std.get("first_name"))
-            fill('input[name*="last_name"  i]', std.get("last_name"))
-            fill('input[type="email"]',          std.get("email"))
-            fill('input[type="tel"]',            std.get("phone"))
-
-            # long-answer textareas
-            keys = _visible_textarea_keys(pg)
-            tas  = pg.locator("textarea:visible")
-            for i in range(tas.count()):
-                ta  = tas.nth(i)
-                key = keys[i] if i < len(keys) else f"question_{i+1}"
-                val = (custom_answers.get(key) or custom_answers.get(key.lower()) or "").strip()
-                if not val:
-                    # keep test forms non-empty so you can see it working
-                    val = f"{std.get('first_name','I')} have relevant experience for \"{key}\". Happy to discuss in detail."
-                try:
-                    ta.fill(val)
-                    filled.append({"key": key, "chars": len(val)})
-                except Exception:
-                    try:
-                        ta.click()
-                        pg.keyboard.type(val)
-                        filled.append({"key": key, "chars": len(val), "typed": True})
-                    except Exception:
-                        filled.append({"key": key, "error": "could_not_fill"})
-
-            if debug:
-                before = debug_dir / "before_submit.png"
-                try:
-                    pg.screenshot(path=str(before), full_page=True)
-                    shots["before"] = str(before)
-                except Exception:
-                    pass
-
-            # submit
-            submitted = False
-            for sel in ['button:has-text("Submit")', 'button:has-text("Apply")',
-                        'button[type="submit"]', 'input[type="submit"]']:
-                if pg.locator(sel).count():
-                    try:
-                        pg.click(sel)
-                        submitted = True
-                    except Exception:
-                        pass
-                    break
-
-            if submitted:
-                try:
-                    pg.wait_for_load_state("networkidle", timeout=15000)
-                except Exception:
-                    pass
-
-            if debug:
-                after = debug_dir / "after_submit.png"
-                try:
-                    pg.screenshot(path=str(after), full_page=True)
-                    shots["after"] = str(after)
-                except Exception:
-                    pass
-
-            # best-effort confirmation
-            conf_txt = ""
-            try:
-                el = pg.locator('text=/thank you|application submitted|confirmation/i').first
-                if el and el.is_visible():
-                    conf_txt = (el.text_content() or "").strip()
-            except Exception:
-                pass
-
-            b.close()
-            return conf_txt, {"filled": filled, "shots": shots}
-
-    return run_playwright(_impl)
+    with FormSession(app_url, company_slug, debug=debug) as session:
+        return session.submit(std, resume_pdf, custom_answers)
@@ -0,0 +1,270 @@
+# app/services/connectors/greenhouse_async.py
+"""
+playwright.async_api version of the Greenhouse connector.
+
+Same flow as connectors/greenhouse.py (navigate once, discover fields, bulk
+fill, submit, signal-driven waits), but every step awaits on the running
+event loop, so async routes can drive many applications concurrently without
+pinning a threadpool worker per application.
+"""
+from __future__ import annotations
+
+from contextlib import AsyncExitStack
+from typing import Dict, List, Optional, Tuple
+
+from playwright.async_api import BrowserContext, Page
+
+from ...config import settings
+from ...utils.browser import get_async_browser_pool
+from ..artifacts import ArtifactStore, prune_artifacts_in_background, screenshot_options
+from .forms import bulk_fill_async, discover_fields_async, question_keys
+from .greenhouse import SUBMIT_SELECTORS, _fill_values, _filled_report, _submit_failed, _to_embed_url
+from .routing import install_route_policy_async
+from ..sources.greenhouse import fetch_greenhouse_questions
+from .waits import (
+    CONFIRMATION_SELECTOR,
+    AsyncSubmitWatcher,
+    WaitLog,
+    wait_for_fields_async,
+)
+
+
+# ---------- page steps ----------
+async def _capture(pg: Page, artifacts: ArtifactStore, name: str, shots: Dict[str, str], key: str) -> None:
+    try:
+        shots[key] = artifacts.write(name, await pg.screenshot(**screenshot_options()))
+    except Exception:
+        pass
+
+
+async def _goto_greenhouse_form(page: Page, url: str, company_slug: Optional[str]) -> None:
+    """Prefer embed URL. Else land on wrapper → iframe → direct link."""
+    embed = _to_embed_url(url, company_slug)
+    if embed:
+        await page.goto(embed, wait_until="domcontentloaded")
+        return
+
+    await page.goto(url, wait_until="domcontentloaded")
+
+    if ("greenhouse.io" in page.url) or ("boards.greenhouse.io" in page.url):
+        return
+
+    iframe = page.locator('iframe[src*="greenhouse.io"]').first
+    if await iframe.count():
+        src = await iframe.get_attribute("src")
+        if src:
+            await page.goto(src, wait_until="domcontentloaded")
+            return
+
+    link = page.locator('a[href*="greenhouse.io"], a[href*="boards.greenhouse.io"]').first
+    if await link.count():
+        href = await link.get_attribute("href")
+        if href:
+            await page.goto(href, wait_until="domcontentloaded")
+            return
+
+
+async def _load_form(pg: Page, app_url: str, company_slug: Optional[str], waits: WaitLog) -> List[Dict]:
+    with waits.step("goto"):
+        await _goto_greenhouse_form(pg, app_url, company_slug)
+    with waits.step("fields_attached"):
+        await wait_for_fields_async(pg)
+    with waits.step("discover"):
+        return await discover_fields_async(pg)
+
+
+async def _fill_and_submit(
+    pg: Page,
+    fields: List[Dict],
+    std: Dict[str, str],
+    resume_pdf: str,
+    custom_answers: Dict[str, str],
+    artifacts: Optional[ArtifactStore],
+    waits: WaitLog,
+) -> Tuple[str, Dict]:
+    shots: Dict[str, str] = {}
+
+    with waits.step("upload"):
+        if await pg.locator('input[type="file"]').count():
+            try:
+                await pg.set_input_files('input[type="file"]', resume_pdf)
+            except Exception:
+                pass
+
+    values, answer_keys = _fill_values(fields, std, custom_answers)
+    with waits.step("fill"):
+        status = await bulk_fill_async(pg, values)
+    filled = _filled_report(status, values, answer_keys)
+
+    if artifacts is not None:
+        await _capture(pg, artifacts, "before_submit.jpg", shots, "before")
+
+    submitted = False
+    signal = None
+    watcher = await AsyncSubmitWatcher.arm(pg)
+    for sel in SUBMIT_SELECTORS:
+        if await pg.locator(sel).count():
+            try:
+                await pg.click(sel)
+                submitted = True
+            except Exception:
+                pass
+            break
+
+    if submitted:
+        with waits.step("submit_outcome"):
+            signal = await watcher.wait(timeout_ms=15000)
+
+    if artifacts is not None:
+        await _capture(pg, artifacts, "after_submit.jpg", shots, "after")
+
+    conf_txt = ""
+    try:
+        el = pg.locator(CONFIRMATION_SELECTOR).first
+        if await el.is_visible():
+            conf_txt = ((await el.text_content()) or "").strip()
+    except Exception:
+        pass
+
+    return conf_txt, {
+        "filled": filled,
+        "shots": shots,
+        "submit_signal": signal,
+        "post_status": watcher.post_status,
+        "waits": waits.steps,
+    }
+
+
+# ---------- form session ----------
+class AsyncFormSession:
+    """
+    Async FormSession: `async with AsyncFormSession(url, slug) as s:` loads the
+    form once; s.questions is ready inside the block and s.submit() reuses the page.
+    """
+
+    def __init__(
+        self,
+        app_url: str,
+        company_slug: Optional[str] = None,
+        headless: Optional[bool] = None,
+        debug: bool = False,
+        run_id: Optional[str] = None,
+    ):
+        if headless is None:
+            headless = bool(getattr(settings, "playwright_headless", True))
+        self.app_url = app_url
+        self.company_slug = company_slug
+        self.headless = headless
+        self.artifacts = ArtifactStore(run_id) if debug else None
+        self._ctx: Optional[BrowserContext] = None
+        self._tracing = False
+        self.form_url = ""
+        self.fields: List[Dict] = []
+        self.questions: List[str] = []
+        self.waits = WaitLog()
+        self._page: Optional[Page] = None
+        self._route_stats = None
+        self._stack: Optional[AsyncExitStack] = None
+
+    async def open(self) -> "AsyncFormSession":
+        stack = AsyncExitStack()
+        try:
+            ctx: BrowserContext = await stack.enter_async_context(
+                get_async_browser_pool(headless=self.headless).lease()
+            )
+            self._ctx = ctx
+            self._route_stats = await install_route_policy_async(ctx)
+            if self.artifacts is not None and settings.debug_traces:
+                await ctx.tracing.start(screenshots=True, snapshots=True)
+                self._tracing = True
+            self._page = await ctx.new_page()
+            self.fields = await _load_form(self._page, self.app_url, self.company_slug, self.waits)
+            self.form_url = self._page.url
+            self.questions = question_keys(self.fields)
+        except BaseException:
+            await self._stop_trace(failed=True)
+            self._ctx = None
+            await stack.aclose()
+            raise
+        self._stack = stack
+        return self
+
+    async def submit(
+        self,
+        std: Dict[str, str],
+        resume_pdf: str,
+        custom_answers: Dict[str, str],
+        debug: Optional[bool] = None,
+    ) -> Tuple[str, Dict]:
+        if self._page is None:
+            raise RuntimeError("form session is not open")
+        if debug and self.artifacts is None:
+            self.artifacts = ArtifactStore()
+        store = self.artifacts if debug is not False else None
+        try:
+            conf_txt, info = await _fill_and_submit(
+                self._page, self.fields, std, resume_pdf, custom_answers, store, self.waits
+            )
+        except BaseException:
+            await self._stop_trace(failed=True)
+            raise
+        await self._stop_trace(failed=_submit_failed(info))
+        info["blocked"] = self.blocked()
+        if store is not None:
+            info["artifacts"] = store.manifest()
+            prune_artifacts_in_background()
+        return conf_txt, info
+
+    async def _stop_trace(self, failed: bool) -> None:
+        if not self._tracing or self._ctx is None:
+            return
+        self._tracing = False
+        store = self.artifacts
+        try:
+            if failed and store is not None:
+                path = store.path_for("trace.zip")
+                await self._ctx.tracing.stop(path=str(path))
+                store.add_file("trace.zip", path)
+            else:
+                await self._ctx.tracing.stop()
+        except Exception:
+            pass
+
+    def blocked(self) -> Dict:
+        return self._route_stats.report() if self._route_stats is not None else {}
+
+    async def close(self) -> None:
+        await self._stop_trace(failed=False)
+        self._page = None
+        self._ctx = None
+        if self._stack is not None:
+            stack, self._stack = self._stack, None
+            await stack.aclose()
+
+    async def __aenter__(self) -> "AsyncFormSession":
+        return await self.open()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+# ---------- public API ----------
+async def collect_questions_async(app_url: str, company_slug: Optional[str] = None) -> List[str]:
+    """Boards JSON API first; load the form only if the API can't answer."""
+    fields = await fetch_greenhouse_questions(app_url, company_slug)
+    if fields:
+        return question_keys(fields)
+    async with AsyncFormSession(app_url, company_slug, headless=True) as session:
+        return session.questions
+
+
+async def submit_greenhouse_async(
+    app_url: str,
+    std: Dict[str, str],
+    resume_pdf: str,
+    custom_answers: Dict[str, str],
+    company_slug: Optional[str] = None,
+    debug: bool = False,
+) -> Tuple[str, Dict]:
+    async with AsyncFormSession(app_url, company_slug, debug=debug) as session:
+        return await session.submit(std, resume_pdf, custom_answers)
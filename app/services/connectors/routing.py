@@ -0,0 +1,142 @@
+# app/services/connectors/routing.py
+"""
+Request interception for connector pages.
+
+Aborts heavy or irrelevant requests (images, media, fonts, analytics and
+chat widgets) while letting through what application forms need, such as
+reCAPTCHA and S3 upload endpoints. Blocked counts are kept per page.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ...config import settings
+
+# Hosts that never matter for filling a form
+TRACKER_HOSTS: Tuple[str, ...] = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "googleadservices.com", "facebook.net", "connect.facebook.com",
+    "hotjar.com", "segment.io", "segment.com", "intercom.io", "intercomcdn.com",
+    "drift.com", "driftt.com", "hs-analytics.net", "hs-scripts.com",
+    "snap.licdn.com", "bat.bing.com", "clarity.ms", "fullstory.com",
+    "mouseflow.com", "optimizely.com", "static.zdassets.com", "zopim.com",
+    "quantserve.com", "scorecardresearch.com", "newrelic.com", "nr-data.net",
+)
+
+# Always allowed, even if the type or host would otherwise be blocked
+ALLOWED_PATTERNS: Tuple[str, ...] = (
+    "recaptcha", "hcaptcha", "gstatic.com/recaptcha",
+    "amazonaws.com", "s3.", "cloudfront.net/uploads",
+)
+
+# Rough transfer sizes used to estimate bytes saved (aborted requests never report a size)
+_EST_BYTES = {"image": 40_000, "media": 500_000, "font": 35_000, "script": 60_000}
+_EST_DEFAULT = 10_000
+
+
+def _csv(raw: str) -> Tuple[str, ...]:
+    return tuple(x.strip().lower() for x in (raw or "").split(",") if x.strip())
+
+
+class RoutePolicy:
+    def __init__(
+        self,
+        block_types: Iterable[str] = ("image", "media", "font"),
+        block_hosts: Iterable[str] = TRACKER_HOSTS,
+        allow_patterns: Iterable[str] = ALLOWED_PATTERNS,
+    ):
+        self.block_types = frozenset(block_types)
+        self.block_hosts = tuple(block_hosts)
+        self.allow_patterns = tuple(allow_patterns)
+
+    @classmethod
+    def from_settings(cls) -> "RoutePolicy":
+        return cls(
+            block_types=_csv(settings.blocked_resource_types),
+            block_hosts=TRACKER_HOSTS + _csv(settings.blocked_hosts_extra),
+            allow_patterns=ALLOWED_PATTERNS + _csv(settings.allowed_url_patterns_extra),
+        )
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        u = url.lower()
+        if any(p in u for p in self.allow_patterns):
+            return False
+        if resource_type in self.block_types:
+            return True
+        host = u.split("://", 1)[-1].split("/", 1)[0]
+        return any(host == h or host.endswith("." + h) for h in self.block_hosts)
+
+
+class RouteStats:
+    """Blocked request counts and estimated bytes saved, per page."""
+
+    def __init__(self):
+        self._pages: Dict[Any, Dict[str, Any]] = {}
+
+    def record(self, page: Any, resource_type: str) -> None:
+        s = self._pages.setdefault(page, {"blocked": 0, "est_bytes_saved": 0, "by_type": {}})
+        s["blocked"] += 1
+        s["est_bytes_saved"] += _EST_BYTES.get(resource_type, _EST_DEFAULT)
+        s["by_type"][resource_type] = s["by_type"].get(resource_type, 0) + 1
+
+    def report(self) -> Dict[str, Any]:
+        pages = []
+        for page, s in self._pages.items():
+            try:
+                url = page.url
+            except Exception:
+                url = ""
+            pages.append({"url": url, **s})
+        return {
+            "blocked": sum(p["blocked"] for p in pages),
+            "est_bytes_saved": sum(p["est_bytes_saved"] for p in pages),
+            "pages": pages,
+        }
+
+
+def _page_of(request) -> Any:
+    try:
+        return request.frame.page
+    except Exception:
+        return None
+
+
+def install_route_policy(ctx, policy: Optional[RoutePolicy] = None) -> Optional[RouteStats]:
+    """
+    Route every request in a (sync) BrowserContext through the policy.
+    Returns the stats collector, or None when blocking is disabled.
+    """
+    if not settings.block_heavy_resources:
+        return None
+    policy = policy or RoutePolicy.from_settings()
+    stats = RouteStats()
+
+    def _handle(route):
+        req = route.request
+        if policy.should_block(req.url, req.resource_type):
+            stats.record(_page_of(req), req.resource_type)
+            route.abort()
+        else:
+            route.continue_()
+
+    ctx.route("**/*", _handle)
+    return stats
+
+
+async def install_route_policy_async(ctx, policy: Optional[RoutePolicy] = None) -> Optional[RouteStats]:
+    """install_route_policy for a playwright.async_api BrowserContext."""
+    if not settings.block_heavy_resources:
+        return None
+    policy = policy or RoutePolicy.from_settings()
+    stats = RouteStats()
+
+    async def _handle(route):
+        req = route.request
+        if policy.should_block(req.url, req.resource_type):
+            stats.record(_page_of(req), req.resource_type)
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await ctx.route("**/*", _handle)
+    return stats
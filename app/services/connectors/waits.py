@@ -0,0 +1,244 @@
+# app/services/connectors/waits.py
+"""
+Signal-driven waits for connector pages.
+
+Instead of blanket `networkidle` waits (which run to their full timeout on
+sites with long-polling analytics), each step resolves on the first concrete
+signal: fields attached, the application POST response, a URL change, or a
+confirmation message. Every step's duration is recorded for debug info.
+
+Signals are raced with Playwright's own event-driven waits, never a sleep
+loop. The async watcher races locator.wait_for, page.wait_for_url and the
+response event as tasks. Sync Playwright can only block on one wait at a
+time, so the sync watcher races in the page instead: a single
+wait_for_function, re-evaluated on DOM mutations, with fetch/XHR hooked to
+mark the application POST on <html>. Playwright re-runs it in the document a
+full navigation loads, where the missing arm marker is itself the signal.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterator, Optional
+
+FIELDS_SELECTOR = 'input:not([type="hidden"]), textarea, select'
+_CONFIRMATION_PATTERN = "thank you|application submitted|confirmation"
+CONFIRMATION_SELECTOR = f"text=/{_CONFIRMATION_PATTERN}/i"
+
+# POSTs that carry the application itself (classic embed + new job boards)
+_APPLICATION_POST_HINTS = ("/applications", "job_app", "/apply")
+
+# in-page: mark application POSTs on <html> (a DOM mutation wakes the waiter) and
+# remember where the page started and how many confirmation phrases it showed
+_ARM_JS = """
+({hints, pattern}) => {
+  const root = document.documentElement;
+  const mark = (method, url, status) => {
+    if (String(method || "GET").toUpperCase() === "POST" && hints.some((h) => String(url).includes(h)))
+      root.setAttribute("data-applypilot-post", String(status));
+  };
+  if (window.fetch && !window.fetch.__applypilot) {
+    const fetch0 = window.fetch;
+    const fetch1 = function (input, init) {
+      const method = (init && init.method) || (input && input.method);
+      const url = typeof input === "string" ? input : (input && input.url) || "";
+      return fetch0.apply(this, arguments).then((r) => { mark(method, url, r.status); return r; });
+    };
+    fetch1.__applypilot = true;
+    window.fetch = fetch1;
+  }
+  const open0 = XMLHttpRequest.prototype.open;
+  if (!open0.__applypilot) {
+    const open1 = function (method, url) {
+      this.addEventListener("loadend", () => mark(method, url, this.status));
+      return open0.apply(this, arguments);
+    };
+    open1.__applypilot = true;
+    XMLHttpRequest.prototype.open = open1;
+  }
+  root.removeAttribute("data-applypilot-post");
+  const text = (document.body && document.body.innerText) || "";
+  window.__applypilot = {url: location.href, confirm: (text.match(new RegExp(pattern, "gi")) || []).length};
+}
+"""
+
+_FIRED_JS = """
+(pattern) => {
+  const armed = window.__applypilot;
+  if (!armed) return "url_change";  // re-run in a new document: the submit navigated
+  const text = (document.body && document.body.innerText) || "";
+  if ((text.match(new RegExp(pattern, "gi")) || []).length > armed.confirm) return "confirmation";
+  if (document.documentElement.hasAttribute("data-applypilot-post")) return "post_response";
+  if (location.href !== armed.url) return "url_change";
+  return null;
+}
+"""
+
+
+class WaitLog:
+    """Per-step wall-clock durations in milliseconds."""
+
+    def __init__(self):
+        self.steps: Dict[str, float] = {}
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = round((time.perf_counter() - t0) * 1000, 1)
+
+
+def wait_for_fields(page, timeout_ms: float = 10000) -> bool:
+    """Resolve as soon as any form field is attached to the DOM."""
+    try:
+        page.wait_for_selector(FIELDS_SELECTOR, state="attached", timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+def is_application_post(response) -> bool:
+    req = response.request
+    return req.method == "POST" and any(h in req.url for h in _APPLICATION_POST_HINTS)
+
+
+def _new_confirmation(page, confirm_before: int):
+    """Locator for a confirmation message beyond the ones shown when armed."""
+    return page.locator(CONFIRMATION_SELECTOR).nth(confirm_before)
+
+
+class SubmitWatcher:
+    """
+    Arm before clicking submit; wait() afterwards resolves on the application
+    POST response, a URL change, or a new confirmation message.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.start_url = page.url
+        self.post_status: Optional[int] = None
+        try:
+            self._confirm_before = page.locator(CONFIRMATION_SELECTOR).count()
+        except Exception:
+            self._confirm_before = 0
+        try:
+            page.evaluate(_ARM_JS, {"hints": list(_APPLICATION_POST_HINTS), "pattern": _CONFIRMATION_PATTERN})
+        except Exception:
+            pass
+        page.on("response", self._on_response)
+
+    def _on_response(self, response) -> None:
+        if self.post_status is None and is_application_post(response):
+            self.post_status = response.status
+
+    def _race(self, timeout_ms: float) -> Optional[str]:
+        try:
+            handle = self.page.wait_for_function(
+                _FIRED_JS, arg=_CONFIRMATION_PATTERN, polling="mutation", timeout=timeout_ms
+            )
+            return handle.json_value()
+        except Exception:
+            # timed out, or the page closed / navigated mid-evaluation
+            if self.post_status is not None:
+                return "post_response"
+            if self.page.url != self.start_url:
+                return "url_change"
+            return None
+
+    def wait(self, timeout_ms: float = 15000, confirm_ms: float = 5000) -> Optional[str]:
+        fired = self._race(timeout_ms)
+        if fired in ("post_response", "url_change"):
+            # the server answered; give the thank-you message a short window to render
+            try:
+                _new_confirmation(self.page, self._confirm_before).wait_for(state="attached", timeout=confirm_ms)
+            except Exception:
+                pass
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+        return fired
+
+
+# ---------- async_api variants ----------
+async def race_async(waits: Dict[str, Awaitable[Any]], timeout_ms: float) -> Optional[str]:
+    """
+    Name of the first wait that completes without raising, or None once all
+    have failed or timeout_ms passes. The losers are cancelled.
+    """
+    tasks = {asyncio.ensure_future(w): name for name, w in waits.items()}
+    pending = set(tasks)
+    deadline = time.monotonic() + timeout_ms / 1000
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:  # ties go to the earlier signal
+                if task in done and not task.cancelled() and task.exception() is None:
+                    return tasks[task]
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def wait_for_fields_async(page, timeout_ms: float = 10000) -> bool:
+    try:
+        await page.wait_for_selector(FIELDS_SELECTOR, state="attached", timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+class AsyncSubmitWatcher:
+    """SubmitWatcher for a playwright.async_api Page; create via arm()."""
+
+    def __init__(self, page):
+        self.page = page
+        self.start_url = page.url
+        self.post_status: Optional[int] = None
+        self._confirm_before = 0
+        self._posted = asyncio.Event()
+
+    @classmethod
+    async def arm(cls, page) -> "AsyncSubmitWatcher":
+        w = cls(page)
+        try:
+            w._confirm_before = await page.locator(CONFIRMATION_SELECTOR).count()
+        except Exception:
+            pass
+        page.on("response", w._on_response)
+        return w
+
+    def _on_response(self, response) -> None:
+        if self.post_status is None and is_application_post(response):
+            self.post_status = response.status
+            self._posted.set()
+
+    def _confirmation(self, timeout_ms: float) -> Awaitable[None]:
+        return _new_confirmation(self.page, self._confirm_before).wait_for(state="attached", timeout=timeout_ms)
+
+    async def wait(self, timeout_ms: float = 15000, confirm_ms: float = 5000) -> Optional[str]:
+        fired = await race_async(
+            {
+                "confirmation": self._confirmation(timeout_ms),
+                "post_response": self._posted.wait(),
+                "url_change": self.page.wait_for_url(
+                    lambda url: url != self.start_url, wait_until="commit", timeout=timeout_ms
+                ),
+            },
+            timeout_ms,
+        )
+        if fired in ("post_response", "url_change"):
+            await race_async({"confirmation": self._confirmation(confirm_ms)}, confirm_ms)
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+        return fired
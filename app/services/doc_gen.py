@@ -1,13 +1,25 @@
 # app/services/doc_gen.py
 from __future__ import annotations
 
+import asyncio
+import shutil
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from uuid import uuid4
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape, TemplateNotFound
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    TemplateNotFound,
+    select_autoescape,
+)
 
-from .winloop import run_playwright           # Windows-safe wrapper
 from ..config import settings
+from ..utils.browser import get_async_browser_pool, get_browser_pool
+from .pdf_cache import get_pdf_cache, pdf_cache_key
 
 
 # --------------------------
@@ -110,51 +122,244 @@ def _ensure_default_template(tmpl_dir: Path) -> None:
         tpl.write_text(_DEFAULT_TEMPLATE, encoding="utf-8")
 
 
-def _env() -> Environment:
-    tmpl_dir = _resolve_templates_dir()
-    _ensure_default_template(tmpl_dir)
-    return Environment(
-        loader=FileSystemLoader(str(tmpl_dir)),
-        autoescape=select_autoescape(["html", "j2", "jinja"]),
-        enable_async=False,
-    )
+_ENV: Optional[Environment] = None
+_ENV_LOCK = threading.Lock()
+
+
+def get_env() -> Environment:
+    """
+    Process-wide Jinja environment. Templates compile once (bytecode persists in
+    <cache_dir>/jinja across restarts); with auto_reload an edited template is
+    picked up via its mtime without a restart.
+    """
+    global _ENV
+    if _ENV is None:
+        with _ENV_LOCK:
+            if _ENV is None:
+                tmpl_dir = _resolve_templates_dir()
+                _ensure_default_template(tmpl_dir)
+                bcc_dir = settings.cache_path / "jinja"
+                bcc_dir.mkdir(parents=True, exist_ok=True)
+                _ENV = Environment(
+                    loader=FileSystemLoader(str(tmpl_dir)),
+                    autoescape=select_autoescape(["html", "j2", "jinja"]),
+                    enable_async=False,
+                    auto_reload=settings.templates_auto_reload,
+                    bytecode_cache=FileSystemBytecodeCache(str(bcc_dir)),
+                )
+    return _ENV
 
 
 # --------------------------
 # Public API
 # --------------------------
-def render_resume_html(ctx: Dict[str, Any]) -> str:
-    """Render resume HTML from templates/resume.html.j2 with context."""
-    env = _env()
+def render_template(name: str, ctx: Dict[str, Any]) -> str:
+    """Render any template in templates/ (e.g. "resume.html.j2", "cover.html.j2")."""
+    env = get_env()
     try:
-        tpl = env.get_template("resume.html.j2")
+        tpl = env.get_template(name)
     except TemplateNotFound:
-        _ensure_default_template(_resolve_templates_dir())
-        tpl = env.get_template("resume.html.j2")
+        if name != "resume.html.j2":
+            raise
+        _ensure_default_template(_resolve_templates_dir())  # deleted while running
+        tpl = env.get_template(name)
     return tpl.render(**ctx)
 
 
-def _pdf_from_html_with_playwright(html: str, out_path: Path) -> None:
-    """Generate a PDF via Playwright; run through winloop to be Windows-safe."""
-    def _impl():
-        from playwright.sync_api import sync_playwright
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.set_content(html, wait_until="load")
-            page.emulate_media(media="screen")
-            page.pdf(
-                path=str(out_path),
-                print_background=True,
-                prefer_css_page_size=True,
-            )
-            browser.close()
-    run_playwright(_impl)
-
-
-def html_to_pdf(html: str, out_path: str) -> str:
-    """Convert HTML to a PDF at out_path and return the absolute path."""
+def render_resume_html(ctx: Dict[str, Any]) -> str:
+    """Render resume HTML from templates/resume.html.j2 with context."""
+    return render_template("resume.html.j2", ctx)
+
+
+# --------------------------
+# PDF rendering
+# --------------------------
+_PDF_OPTIONS: Dict[str, Any] = {"print_background": True, "prefer_css_page_size": True}
+
+
+def _fresh_out_path() -> Path:
+    return settings.doc_out_path / f"doc_{uuid4().hex}.pdf"
+
+
+def _target(html: str, out_path: Optional[str]) -> Tuple[Optional[str], Path, Optional[str]]:
+    """(cache key, path to render into, cached PDF if already rendered)."""
+    cache = get_pdf_cache()
+    if cache is None:
+        return None, Path(out_path) if out_path else _fresh_out_path(), None
+    key = pdf_cache_key(html, _PDF_OPTIONS)
+    return key, cache.staging_path(key), cache.lookup(key)
+
+
+def _commit(key: Optional[str], rendered: Path) -> str:
+    cache = get_pdf_cache()
+    return cache.commit(key, rendered) if (key and cache) else str(rendered)
+
+
+def _deliver(pdf: str, out_path: Optional[str]) -> str:
+    """Cached PDFs are returned in place unless the caller asked for a specific path."""
+    if not out_path or Path(out_path).resolve() == Path(pdf).resolve():
+        return pdf
     out = Path(out_path)
     out.parent.mkdir(parents=True, exist_ok=True)
-    _pdf_from_html_with_playwright(html, out)
+    shutil.copyfile(pdf, out)
     return str(out)
+
+
+def _pdf_from_html_with_playwright(html: str, out_path: Path) -> None:
+    """Generate a PDF on a pooled headless browser (PDF needs headless Chromium)."""
+    def _impl(ctx):
+        page = ctx.new_page()
+        page.set_content(html, wait_until="load")
+        page.emulate_media(media="screen")
+        page.pdf(path=str(out_path), **_PDF_OPTIONS)
+    get_browser_pool(headless=True).run(_impl)
+
+
+def html_to_pdf(html: str, out_path: Optional[str] = None) -> str:
+    """
+    Convert HTML to a PDF and return its absolute path. Identical HTML is served
+    from the content-addressed cache; pass out_path only if the file must live there.
+    """
+    key, target, hit = _target(html, out_path)
+    if hit:
+        return _deliver(hit, out_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    _pdf_from_html_with_playwright(html, target)
+    return _deliver(_commit(key, target), out_path)
+
+
+async def html_to_pdf_async(html: str, out_path: Optional[str] = None) -> str:
+    """html_to_pdf on the running event loop (async routes)."""
+    key, target, hit = _target(html, out_path)
+    if hit:
+        return _deliver(hit, out_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    async with get_async_browser_pool(headless=True).lease() as ctx:
+        page = await ctx.new_page()
+        await page.set_content(html, wait_until="load")
+        await page.emulate_media(media="screen")
+        await page.pdf(path=str(target), **_PDF_OPTIONS)
+    return _deliver(_commit(key, target), out_path)
+
+
+# --------------------------
+# Batch rendering
+# --------------------------
+# (key, html, render target, indexes of the docs that share this content)
+_Render = Tuple[Optional[str], str, Path, List[int]]
+
+
+def _plan_batch(docs: Sequence[Tuple[str, Optional[str]]]) -> Tuple[List[Optional[Dict[str, Any]]], List[_Render]]:
+    """Resolve cache hits up front and collapse identical documents into one render."""
+    results: List[Optional[Dict[str, Any]]] = [None] * len(docs)
+    renders: Dict[str, _Render] = {}
+    for i, (html, out_path) in enumerate(docs):
+        key, target, hit = _target(html, out_path)
+        if hit:
+            results[i] = {"out_path": _deliver(hit, out_path), "ok": True, "ms": 0.0, "error": None, "cached": True}
+        elif key and key in renders:
+            renders[key][3].append(i)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            renders[key or f"#{i}"] = (key, html, target, [i])
+    return results, list(renders.values())
+
+
+def _finish_batch(
+    docs: Sequence[Tuple[str, Optional[str]]],
+    results: List[Optional[Dict[str, Any]]],
+    renders: List[_Render],
+    timings: List[Tuple[float, Optional[str]]],
+) -> List[Dict[str, Any]]:
+    for (key, _html, target, idxs), (ms, error) in zip(renders, timings):
+        if error is None:
+            pdf = _commit(key, target)
+        elif key:
+            target.unlink(missing_ok=True)  # partial staging file
+        for n, i in enumerate(idxs):
+            results[i] = {
+                "out_path": _deliver(pdf, docs[i][1]) if error is None else None,
+                "ok": error is None,
+                "ms": ms,
+                "error": error,
+                "cached": n > 0,
+            }
+    return results  # type: ignore[return-value]
+
+
+def _elapsed(t0: float) -> float:
+    return round((time.perf_counter() - t0) * 1000, 1)
+
+
+def _error_text(e: BaseException) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+async def html_to_pdf_batch_async(
+    docs: Sequence[Tuple[str, Optional[str]]],
+    concurrency: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Render many (html, out_path) documents in one browser context.
+    Cache hits and duplicates are resolved first; the rest render over a fixed
+    set of pages reused via set_content. Results come back in input order with
+    per-document timings, and one bad document doesn't fail the batch.
+    """
+    if not docs:
+        return []
+    results, renders = _plan_batch(docs)
+    timings: List[Tuple[float, Optional[str]]] = [(0.0, None)] * len(renders)
+    if renders:
+        n_pages = max(1, min(concurrency or settings.pdf_batch_concurrency, len(renders)))
+        queue: asyncio.Queue = asyncio.Queue()
+        for j, r in enumerate(renders):
+            queue.put_nowait((j, r[1], r[2]))
+
+        async def _worker(page) -> None:
+            while True:
+                try:
+                    j, html, target = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                t0 = time.perf_counter()
+                try:
+                    await page.set_content(html, wait_until="load")
+                    await page.pdf(path=str(target), **_PDF_OPTIONS)
+                    timings[j] = (_elapsed(t0), None)
+                except Exception as e:
+                    timings[j] = (_elapsed(t0), _error_text(e))
+
+        async with get_async_browser_pool(headless=True).lease() as ctx:
+            pages = [await ctx.new_page() for _ in range(n_pages)]
+            for page in pages:
+                await page.emulate_media(media="screen")
+            await asyncio.gather(*(_worker(p) for p in pages))
+    return _finish_batch(docs, results, renders, timings)
+
+
+def html_to_pdf_batch(docs: Sequence[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+    """
+    Sync batch: one lease and one reused page for the whole list. Sync
+    Playwright is thread-bound, so documents render back to back; the saving
+    is skipping a context/page setup per document.
+    """
+    if not docs:
+        return []
+    results, renders = _plan_batch(docs)
+
+    def _impl(ctx) -> List[Tuple[float, Optional[str]]]:
+        page = ctx.new_page()
+        page.emulate_media(media="screen")
+        out: List[Tuple[float, Optional[str]]] = []
+        for _key, html, target, _idxs in renders:
+            t0 = time.perf_counter()
+            try:
+                page.set_content(html, wait_until="load")
+                page.pdf(path=str(target), **_PDF_OPTIONS)
+                out.append((_elapsed(t0), None))
+            except Exception as e:
+                out.append((_elapsed(t0), _error_text(e)))
+        return out
+
+    timings = get_browser_pool(headless=True).run(_impl) if renders else []
+    return _finish_batch(docs, results, renders, timings)
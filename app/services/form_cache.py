@@ -0,0 +1,102 @@
+# app/services/form_cache.py
+"""
+Cache of discovered application forms on Job.fields_schema.
+
+Shape:
+  {
+    "form_url":    resolved form URL (after wrapper/iframe hops),
+    "fingerprint": hash of the field descriptors,
+    "fields":      descriptor list from connectors/forms.py,
+    "scraped_at":  ISO time the fingerprint last changed,
+    "checked_at":  ISO time the form was last seen live,
+    "source":      "browser" (live DOM) or "api" (boards JSON API),
+  }
+
+Previews read from here while the entry is younger than the TTL; any live
+page load (e.g. a real submit) revalidates it and replaces the fields only
+when the fingerprint changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Job
+from .connectors.forms import question_keys
+
+
+def form_fingerprint(fields: List[Dict[str, Any]]) -> str:
+    """Stable hash of what matters for filling: kind, name, label, required, options."""
+    shape = [
+        [
+            f.get("kind", ""),
+            f.get("name", ""),
+            f.get("label", ""),
+            bool(f.get("required")),
+            [o.get("value", "") for o in (f.get("options") or [])],
+            bool(f.get("visible")),
+        ]
+        for f in fields
+    ]
+    raw = json.dumps(shape, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _parse_ts(raw: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def fresh_form_schema(job: Job, max_age_hours: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Return the cached schema if it exists and was checked within the TTL."""
+    schema = job.fields_schema or {}
+    if not schema.get("fields") and not schema.get("fingerprint"):
+        return None
+    ttl = settings.form_schema_ttl_hours if max_age_hours is None else max_age_hours
+    checked = _parse_ts(schema.get("checked_at", ""))
+    if checked is None or datetime.utcnow() - checked > timedelta(hours=ttl):
+        return None
+    return schema
+
+
+def schema_questions(schema: Dict[str, Any]) -> List[str]:
+    return question_keys(schema.get("fields") or [])
+
+
+def form_entry_url(job: Job) -> str:
+    """Resolved form URL from a previous visit (skips wrapper hops), else the job URL."""
+    cached = (job.fields_schema or {}).get("form_url") or ""
+    return cached if "greenhouse.io" in cached else job.url
+
+
+def store_form_schema(
+    db: Session, job: Job, form_url: str, fields: List[Dict[str, Any]], source: str = "browser"
+) -> bool:
+    """
+    Record a live view of the form. Returns True when the fingerprint changed
+    (or nothing was cached yet). An empty field list never overwrites a cache.
+    """
+    if not fields:
+        return False
+    now = datetime.utcnow().isoformat(timespec="seconds")
+    old = job.fields_schema or {}
+    fp = form_fingerprint(fields)
+    changed = old.get("fingerprint") != fp
+    job.fields_schema = {
+        "form_url": form_url or old.get("form_url", ""),
+        "fingerprint": fp,
+        "fields": fields if changed else old.get("fields", fields),
+        "scraped_at": now if changed else old.get("scraped_at", now),
+        "checked_at": now,
+        "source": source if changed else old.get("source", source),
+    }
+    db.add(job)
+    db.commit()
+    return changed
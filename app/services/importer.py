@@ -0,0 +1,172 @@
+# app/services/importer.py
+"""
+Board imports: fetch many (source, company) boards concurrently and upsert
+their postings into jobs in batches.
+
+Fan-out is bounded twice: a global semaphore caps boards in flight, and the
+shared HTTP client (utils/http.py) caps concurrent requests per host, so a
+sweep of hundreds of Greenhouse boards never has more than HTTP_PER_HOST
+requests open against boards-api.greenhouse.io. A failing board is reported
+in its own result and does not stop the others.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Job
+from .sources.greenhouse import fetch_greenhouse_company_jobs
+from .sources.lever import fetch_lever_company_jobs
+
+FETCHERS: Dict[str, Callable[[str], Awaitable[List[Dict[str, Any]]]]] = {
+    "greenhouse": fetch_greenhouse_company_jobs,
+    "lever": fetch_lever_company_jobs,
+}
+
+_BATCH = 500  # rows per IN (...) lookup / executemany insert (SQLite variable limit)
+
+
+def _ms(t0: float) -> float:
+    return round((time.perf_counter() - t0) * 1000, 1)
+
+
+# ---------- fetch ----------
+async def _fetch_board(source: str, company: str, slots: asyncio.Semaphore) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"source": source, "company": company, "ok": False, "jobs": [], "error": None}
+    fetch = FETCHERS.get(source)
+    if fetch is None:
+        result["error"] = "Unsupported source"
+        result["fetch_ms"] = 0.0
+        return result
+    async with slots:
+        t0 = time.perf_counter()
+        try:
+            result["jobs"] = await fetch(company)
+            result["ok"] = True
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+        result["fetch_ms"] = _ms(t0)
+    return result
+
+
+async def fetch_boards(
+    boards: Iterable[Tuple[str, str]], concurrency: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Fetch every board concurrently; results keep input order, failures carry "error"."""
+    slots = asyncio.Semaphore(max(1, concurrency or settings.import_concurrency))
+    return await asyncio.gather(*(_fetch_board(src, company, slots) for src, company in boards))
+
+
+# ---------- persist ----------
+def _existing_jobs(db: Session, urls: List[str]) -> Dict[str, Job]:
+    out: Dict[str, Job] = {}
+    for i in range(0, len(urls), _BATCH):
+        chunk = urls[i : i + _BATCH]
+        out.update({row.url: row for row in db.query(Job).filter(Job.url.in_(chunk)).all()})
+    return out
+
+
+def _refresh(row: Job, posting: Dict[str, Any]) -> bool:
+    """Update captured content when the board reports a newer posting; True if changed."""
+    newer = posting.get("updated_at") and (
+        row.source_updated_at is None or posting["updated_at"] > row.source_updated_at
+    )
+    if not posting.get("description") or (row.description and not newer):
+        return False
+    if posting["description"] != row.description:
+        row.jd_digest = None  # digested from the old text
+    row.description = posting["description"]
+    row.department = posting.get("department", "")
+    row.external_id = posting.get("external_id", "")
+    row.source_updated_at = posting.get("updated_at")
+    return True
+
+
+def _new_row(posting: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "url": posting["url"],
+        "source": posting["source"],
+        "company": posting["company"],
+        "title": posting["title"],
+        "location": posting["location"],
+        "ats_type": posting["ats_type"],
+        "fields_schema": {},
+        "department": posting.get("department", ""),
+        "external_id": posting.get("external_id", ""),
+        "source_updated_at": posting.get("updated_at"),
+        "description": posting.get("description") or None,
+    }
+
+
+def upsert_jobs(db: Session, boards: List[List[Dict[str, Any]]]) -> List[Tuple[int, int]]:
+    """
+    Insert unseen postings and refresh updated ones, for several boards at once:
+    one URL lookup per 500 postings, executemany inserts, one commit.
+    Returns (imported, updated) per board.
+    """
+    urls = list({p["url"] for postings in boards for p in postings if p.get("url")})
+    existing = _existing_jobs(db, urls)
+    seen = set(existing)
+
+    new_rows: List[Dict[str, Any]] = []
+    counts: List[Tuple[int, int]] = []
+    for postings in boards:
+        imported = updated = 0
+        for p in postings:
+            url = p.get("url")
+            if not url:
+                continue
+            if url in seen:
+                row = existing.get(url)
+                if row is not None and _refresh(row, p):
+                    updated += 1
+                continue
+            seen.add(url)
+            new_rows.append(_new_row(p))
+            imported += 1
+        counts.append((imported, updated))
+
+    for i in range(0, len(new_rows), _BATCH):
+        db.execute(insert(Job), new_rows[i : i + _BATCH])
+    db.commit()
+    return counts
+
+
+# ---------- bulk import ----------
+async def import_boards(
+    db: Session, boards: Iterable[Tuple[str, str]], concurrency: Optional[int] = None
+) -> Dict[str, Any]:
+    """Fetch all boards concurrently, then upsert everything in one batched write."""
+    t0 = time.perf_counter()
+    fetched = await fetch_boards(boards, concurrency)
+    fetch_ms = _ms(t0)
+
+    t1 = time.perf_counter()
+    counts = upsert_jobs(db, [r["jobs"] for r in fetched])
+    write_ms = _ms(t1)
+
+    results = []
+    for r, (imported, updated) in zip(fetched, counts):
+        results.append({
+            "source": r["source"],
+            "company": r["company"],
+            "ok": r["ok"],
+            "seen": len(r["jobs"]),
+            "imported": imported,
+            "updated": updated,
+            "fetch_ms": r["fetch_ms"],
+            "error": r["error"],
+        })
+    return {
+        "boards": len(results),
+        "failed": sum(1 for r in results if not r["ok"]),
+        "imported": sum(r["imported"] for r in results),
+        "updated": sum(r["updated"] for r in results),
+        "timings_ms": {"fetch": fetch_ms, "write": write_ms, "total": _ms(t0)},
+        "results": results,
+    }
@@ -0,0 +1,232 @@
+# app/services/jd_digest.py
+"""
+JD digest: isolate the posting's main content once per job and condense it
+into a small structured summary that every prompt embeds instead of the page.
+
+Stored on Job.jd_digest:
+  {
+    "role", "company", "location", "seniority", "summary",
+    "responsibilities": [...], "requirements": [...], "skills": [...], "nice_to_have": [...],
+    "source_hash": sha1 of the isolated text,
+    "source": "llm" | "text" (model unavailable → trimmed text),
+    "chars_in": isolated text length,
+    "created_at": ISO time,
+  }
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Job
+from .ai import achat_json
+from .jd_parser import fetch_job_details
+from .jd_store import fetch_jd_snapshot, fetch_jd_snapshots, text_hash
+
+DIGEST_SYSTEM = (
+    "You condense job postings into compact structured digests. Use ONLY the posting text; "
+    "keep items short (under 15 words), drop benefits boilerplate, EEO and legal text."
+)
+
+
+# ---------- digest ----------
+def _digest_prompt(text: str, title: str, company: str) -> str:
+    return f"""
+TITLE (from listing): {title}
+COMPANY: {company}
+
+POSTING:
+{text[: settings.jd_digest_max_input_chars]}
+
+Return strict JSON with:
+{{
+  "role": "",
+  "seniority": "intern|junior|mid|senior|staff|principal|manager|director|unknown",
+  "location": "",
+  "summary": "one or two sentences",
+  "responsibilities": ["", ...],
+  "requirements": ["", ...],
+  "skills": ["", ...],
+  "nice_to_have": ["", ...]
+}}
+"""
+
+
+def _as_list(value: Any, limit: int) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    return [str(v).strip() for v in value if str(v).strip()][:limit]
+
+
+def _shape_digest(data: Dict[str, Any], text: str, title: str, company: str) -> Dict[str, Any]:
+    base = {
+        "company": company,
+        "source_hash": text_hash(text),
+        "chars_in": len(text),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+    }
+    if not data:
+        # model unavailable: keep a trimmed copy of the isolated text
+        return {
+            **base,
+            "role": title,
+            "seniority": "unknown",
+            "location": "",
+            "summary": text[: settings.jd_digest_fallback_chars],
+            "responsibilities": [],
+            "requirements": [],
+            "skills": [],
+            "nice_to_have": [],
+            "source": "text",
+        }
+    return {
+        **base,
+        "role": str(data.get("role") or title),
+        "seniority": str(data.get("seniority") or "unknown"),
+        "location": str(data.get("location") or ""),
+        "summary": str(data.get("summary") or ""),
+        "responsibilities": _as_list(data.get("responsibilities"), 8),
+        "requirements": _as_list(data.get("requirements"), 10),
+        "skills": _as_list(data.get("skills"), 20),
+        "nice_to_have": _as_list(data.get("nice_to_have"), 6),
+        "source": "llm",
+    }
+
+
+async def digest_text_async(text: str, title: str = "", company: str = "") -> Dict[str, Any]:
+    try:
+        data = await achat_json(DIGEST_SYSTEM, _digest_prompt(text, title, company))
+    except Exception:
+        data = {}
+    return _shape_digest(data if isinstance(data, dict) else {}, text, title, company)
+
+
+async def build_jd_digest(job: Job, db: Optional[Session] = None) -> Dict[str, Any]:
+    """
+    Isolate the posting's main text and digest it (raises if the fetch fails).
+    Board imports carry the description already (Job.description); otherwise,
+    with a session the text comes from the job's JD snapshot (conditional
+    refetch). An existing digest of the same text is renewed, not rebuilt.
+    """
+    if job.description:
+        details = {"jd_text": job.description, "title": job.title}
+    elif db is not None:
+        details = await fetch_jd_snapshot(db, job)
+    else:
+        details = await fetch_job_details(job.url)
+    text = details.get("jd_text", "")
+    return _renewed(job.jd_digest, text) or await digest_text_async(
+        text, job.title or details.get("title", ""), job.company or ""
+    )
+
+
+def _renewed(previous: Optional[Dict[str, Any]], text: str) -> Optional[Dict[str, Any]]:
+    """The existing model digest with a new timestamp, if it was built from this exact text."""
+    previous = previous or {}
+    if previous.get("source_hash") == text_hash(text) and previous.get("source") == "llm":
+        return {**previous, "created_at": datetime.utcnow().isoformat(timespec="seconds")}
+    return None
+
+
+def digest_prompt_text(digest: Dict[str, Any]) -> str:
+    """Compact text block that prompts embed in place of the raw page."""
+    head = " · ".join(x for x in (digest.get("role"), digest.get("company"), digest.get("location")) if x)
+    parts = [f"ROLE: {head}"]
+    if digest.get("seniority") and digest["seniority"] != "unknown":
+        parts.append(f"SENIORITY: {digest['seniority']}")
+    if digest.get("summary"):
+        parts.append(f"SUMMARY: {digest['summary']}")
+    for label, key in (
+        ("RESPONSIBILITIES", "responsibilities"),
+        ("REQUIREMENTS", "requirements"),
+        ("NICE TO HAVE", "nice_to_have"),
+    ):
+        if digest.get(key):
+            parts.append(f"{label}:\n" + "\n".join(f"- {x}" for x in digest[key]))
+    if digest.get("skills"):
+        parts.append("SKILLS: " + ", ".join(digest["skills"]))
+    return "\n".join(parts)
+
+
+# ---------- per-job storage ----------
+def fresh_jd_digest(job: Job, max_age_hours: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """The stored digest if younger than its TTL; trimmed-text fallbacks expire quickly so the model retries."""
+    digest = job.jd_digest or {}
+    if not digest.get("created_at"):
+        return None
+    if max_age_hours is not None:
+        ttl = max_age_hours
+    elif digest.get("source") == "text":
+        ttl = settings.jd_digest_text_ttl_hours
+    else:
+        ttl = settings.jd_digest_ttl_hours
+    try:
+        created = datetime.fromisoformat(digest["created_at"])
+    except ValueError:
+        return None
+    if datetime.utcnow() - created > timedelta(hours=ttl):
+        return None
+    return digest
+
+
+def store_jd_digest(db: Session, job: Job, digest: Dict[str, Any]) -> None:
+    job.jd_digest = digest
+    db.add(job)
+    db.commit()
+
+
+async def job_jd_text(db: Session, job: Job) -> str:
+    """Prompt-ready JD for one job: the stored digest, or build + store it now."""
+    digest = fresh_jd_digest(job)
+    if digest is None:
+        digest = await build_jd_digest(job, db)
+        store_jd_digest(db, job, digest)
+    return digest_prompt_text(digest)
+
+
+async def build_jd_digests(jobs: Iterable[Job], db: Optional[Session] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Digest every job without a fresh one, concurrently; failures are left out.
+    With a session, snapshots are fetched as one batch (fetch_jd_snapshots) and
+    the gathered model calls never touch the session.
+    """
+    todo = [j for j in jobs if fresh_jd_digest(j) is None]
+    if db is None:
+        results = await asyncio.gather(*(build_jd_digest(j) for j in todo), return_exceptions=True)
+        return {j.id: d for j, d in zip(todo, results) if isinstance(d, dict)}
+
+    pages = await fetch_jd_snapshots(db, [j for j in todo if not j.description])
+    out: Dict[int, Dict[str, Any]] = {}
+    pending: List[Tuple[int, str, str, str]] = []  # (job id, text, title, company)
+    for j in todo:
+        details = {"jd_text": j.description, "title": j.title} if j.description else pages.get(j.id)
+        if not isinstance(details, dict):
+            continue  # fetch failed with no old copy
+        text = details.get("jd_text", "")
+        renewed = _renewed(j.jd_digest, text)
+        if renewed is not None:
+            out[j.id] = renewed
+        else:
+            pending.append((j.id, text, j.title or details.get("title", ""), j.company or ""))
+
+    digests = await asyncio.gather(*(digest_text_async(text, title, company) for _, text, title, company in pending))
+    out.update({jid: d for (jid, *_), d in zip(pending, digests)})
+    return out
+
+
+def store_jd_digests(db: Session, jobs: Iterable[Job], digests: Dict[int, Dict[str, Any]]) -> Dict[int, str]:
+    """Persist freshly built digests; return prompt text for every job that has one."""
+    out: Dict[int, str] = {}
+    for j in jobs:
+        if j.id in digests:
+            j.jd_digest = digests[j.id]
+            db.add(j)
+        digest = fresh_jd_digest(j)
+        if digest is not None:
+            out[j.id] = digest_prompt_text(digest)
+    db.commit()
+    return out
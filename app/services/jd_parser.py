@@ -1,26 +1,363 @@
 """
-Fetch and parse basic job details.
-Note: Each ATS has its own structure; this is a generic starter.
+Fetch and parse job details.
+
+parse_job_html picks extractors by ATS (ats_detect): structured data first
+(schema.org JSON-LD, the ATS's embedded app state), then a parse of just the
+posting container (SoupStrainer), and only as a last resort the whole page
+with main-content isolation. lxml is used when installed.
 """
 
-import httpx
-from bs4 import BeautifulSoup
+import html
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-async def fetch_job_details(url: str) -> dict:
-    # Grab the HTML (follow redirects; many ATS links redirect)
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(url, follow_redirects=True)
-        r.raise_for_status()
+from bs4 import BeautifulSoup, SoupStrainer
+
+from ..utils.http import http_get
+from .ats_detect import detect_ats
+
+try:  # optional: several times faster than html.parser
+    import lxml  # noqa: F401
+    _PARSER = "lxml"
+except ImportError:  # pragma: no cover
+    _PARSER = "html.parser"
+
+
+# ---------- main-content isolation ----------
+_NOISE_TAGS = [
+    "script", "style", "noscript", "template", "svg", "iframe", "form",
+    "nav", "header", "footer", "aside", "button", "select", "input", "textarea",
+]
+_NOISE_HINT = re.compile(
+    r"cookie|consent|gdpr|banner|newsletter|subscribe|navbar|breadcrumb|site-?footer|"
+    r"site-?header|social|share|modal|popup|apply-?form|application-?form",
+    re.I,
+)
+_KEEP_TAGS = {"html", "body", "main", "article"}
+_MAIN_SELECTORS = [
+    "[itemprop=description]",
+    "[data-qa=job-description]",
+    ".job-description",
+    "#job-description",
+    ".job__description",
+    ".posting-page",
+    "#content",
+    "article",
+    "main",
+    "[role=main]",
+]
+_MIN_MAIN_CHARS = 300
+
+
+def _strip_noise(soup: BeautifulSoup) -> None:
+    for el in soup(_NOISE_TAGS):
+        el.decompose()
+    for el in soup.find_all(True):
+        if el.decomposed or el.name in _KEEP_TAGS or el.attrs is None:
+            continue
+        hint = " ".join(el.get("class") or []) + " " + (el.get("id") or "")
+        if hint.strip() and _NOISE_HINT.search(hint):
+            el.decompose()
+
+
+def _densest_block(soup: BeautifulSoup):
+    """Readability-lite: credit paragraph text to its parent (full) and grandparent (half)."""
+    scores: Dict[int, float] = {}
+    nodes: Dict[int, Any] = {}
+    for p in soup.find_all(["p", "li"]):
+        n = len(p.get_text(" ", strip=True))
+        if n < 25:
+            continue
+        for parent, weight in ((p.parent, 1.0), (p.parent.parent if p.parent else None, 0.5)):
+            if parent is None or parent.name in ("html", "[document]"):
+                continue
+            scores[id(parent)] = scores.get(id(parent), 0.0) + n * weight
+            nodes[id(parent)] = parent
+    if not scores:
+        return soup.body or soup
+    return nodes[max(scores, key=scores.get)]
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and drop empty or repeated lines."""
+    seen = set()
+    lines: List[str] = []
+    for raw in text.splitlines():
+        line = re.sub(r"\s+", " ", raw).strip()
+        if len(line) < 2 or line in seen:
+            continue
+        seen.add(line)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def fragment_text(fragment: str) -> str:
+    """Plain text of an HTML fragment (board API description bodies)."""
+    soup = BeautifulSoup(fragment or "", _PARSER)
+    for tag in soup(["script", "style"]):
+        tag.decompose()
+    return normalize_text(soup.get_text("\n", strip=True))
+
+
+def extract_main_text(html: str) -> str:
+    """Posting body without nav, footers, cookie banners or the application form."""
+    soup = BeautifulSoup(html, _PARSER)
+    _strip_noise(soup)
+    root = None
+    for sel in _MAIN_SELECTORS:
+        el = soup.select_one(sel)
+        if el is not None and len(el.get_text(" ", strip=True)) >= _MIN_MAIN_CHARS:
+            root = el
+            break
+    if root is None:
+        root = _densest_block(soup)
+    return normalize_text(root.get_text("\n", strip=True))
+
+
+# ---------- structured data (JSON-LD, embedded app state) ----------
+_LD_JSON = re.compile(
+    r"<script[^>]*type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>", re.S | re.I
+)
+
+
+def _ld_items(data: Any):
+    if isinstance(data, list):
+        for item in data:
+            yield from _ld_items(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _ld_items(data["@graph"])
+
+
+def _is_posting(item: Dict[str, Any]) -> bool:
+    kind = item.get("@type")
+    return "JobPosting" in (kind if isinstance(kind, list) else [kind])
+
+
+def _name(value: Any) -> str:
+    if isinstance(value, dict):
+        return str(value.get("name") or "")
+    return str(value or "")
+
+
+def _ld_location(item: Dict[str, Any]) -> str:
+    places = item.get("jobLocation") or []
+    out: List[str] = []
+    for place in places if isinstance(places, list) else [places]:
+        addr = place.get("address") if isinstance(place, dict) else None
+        if isinstance(addr, dict):
+            parts = [addr.get("addressLocality"), addr.get("addressRegion"), _name(addr.get("addressCountry"))]
+            label = ", ".join(p for p in parts if p)
+        else:
+            label = _name(addr)
+        if label and label not in out:
+            out.append(label)
+    if not out and str(item.get("jobLocationType", "")).upper() == "TELECOMMUTE":
+        out.append("Remote")
+    return "; ".join(out)
+
+
+def _jsonld(page: str) -> Dict[str, str]:
+    """schema.org JobPosting, which most ATS pages embed for search engines."""
+    for raw in _LD_JSON.findall(page):
+        try:
+            data = json.loads(raw.strip())
+        except ValueError:
+            continue
+        for item in _ld_items(data):
+            if _is_posting(item):
+                return {
+                    "title": _name(item.get("title")),
+                    "company": _name(item.get("hiringOrganization")),
+                    "location": _ld_location(item),
+                    "jd_text": fragment_text(html.unescape(str(item.get("description") or ""))),
+                }
+    return {}
+
+
+def _embedded_json(page: str, marker: str) -> Any:
+    """The object literal assigned after `marker` in an inline script (e.g. window.__appData = {...})."""
+    at = page.find(marker)
+    if at < 0:
+        return None
+    brace = page.find("{", at + len(marker))
+    if brace < 0:
+        return None
+    try:
+        obj, _ = json.JSONDecoder().raw_decode(page, brace)
+    except ValueError:
+        return None
+    return obj
 
-    soup = BeautifulSoup(r.text, "html.parser")
 
-    # Naive title guess: first H1/H2
-    h = soup.find(["h1", "h2"])
-    title = h.get_text(strip=True) if h else ""
+def _find_key(obj: Any, key: str, depth: int = 8) -> Any:
+    """First value stored under `key` anywhere in nested dicts/lists (bounded depth)."""
+    if depth < 0:
+        return None
+    if isinstance(obj, dict):
+        if key in obj:
+            return obj[key]
+        children = obj.values()
+    elif isinstance(obj, list):
+        children = obj
+    else:
+        return None
+    for child in children:
+        found = _find_key(child, key, depth - 1)
+        if found is not None:
+            return found
+    return None
 
-    # Company/location extraction varies; fill in per-ATS later
-    company = ""
-    location = ""
 
-    jd_text = soup.get_text(" ", strip=True)  # full text for keywording/tailoring later
-    return {"title": title, "company": company, "location": location, "jd_text": jd_text}
+# ---------- container-only DOM parses ----------
+def _cls(*names: str) -> re.Pattern:
+    """Match elements carrying any of these classes (strainers see the raw class string)."""
+    return re.compile(r"(?:^|\s)(?:%s)(?:\s|$)" % "|".join(map(re.escape, names)))
+
+
+def _strained(page: str, strainer: SoupStrainer) -> BeautifulSoup:
+    """Build a tree of only the elements the strainer matches (plus their subtrees)."""
+    return BeautifulSoup(page, _PARSER, parse_only=strainer)
+
+
+def _container_text(page: str, strainer: SoupStrainer, drop: Optional[re.Pattern] = None) -> str:
+    soup = _strained(page, strainer)
+    _strip_noise(soup)
+    if drop is not None:
+        for el in soup.find_all(attrs={"class": drop}):
+            el.decompose()
+    return normalize_text(soup.get_text("\n", strip=True))
+
+
+def _first_text(soup: BeautifulSoup, **filters) -> str:
+    el = soup.find(**filters)
+    return el.get_text(" ", strip=True) if el is not None else ""
+
+
+# ---------- per-ATS extractors ----------
+# Each returns whatever it could find ({"title", "company", "location", "jd_text"});
+# parse_job_html tries them in order and fills blanks from later ones.
+def _greenhouse_app_state(page: str) -> Dict[str, str]:
+    # job-boards.greenhouse.io (Remix): the posting is in window.__remixContext
+    post = _find_key(_embedded_json(page, "window.__remixContext"), "jobPost")
+    if not isinstance(post, dict):
+        return {}
+    return {
+        "title": str(post.get("title") or ""),
+        "company": str(post.get("company_name") or ""),
+        "location": str(post.get("job_post_location") or ""),
+        "jd_text": fragment_text(html.unescape(str(post.get("content") or ""))),
+    }
+
+
+_GH_HEAD = _cls("app-title", "company-name", "location", "section-header", "job__location")
+_GH_BODY = _cls("job__description", "job-post-content")
+
+
+def _greenhouse_dom(page: str) -> Dict[str, str]:
+    # boards.greenhouse.io: #header (title/company/location) + #content; newer boards: .job__description
+    head = _strained(page, SoupStrainer(attrs={"class": _GH_HEAD}))
+    company = _first_text(head, class_=_cls("company-name"))
+    text = _container_text(page, SoupStrainer(id="content")) or _container_text(
+        page, SoupStrainer(attrs={"class": _GH_BODY})
+    )
+    return {
+        "title": _first_text(head, class_=_cls("app-title", "section-header")),
+        "company": re.sub(r"^at\s+", "", company),
+        "location": _first_text(head, class_=_cls("location", "job__location")),
+        "jd_text": text,
+    }
+
+
+def _lever_dom(page: str) -> Dict[str, str]:
+    # jobs.lever.co: .posting-headline (title + categories), then div.section blocks
+    head = _strained(page, SoupStrainer(attrs={"class": _cls("posting-headline")}))
+    return {
+        "title": _first_text(head, name="h2"),
+        "location": _first_text(head, class_=_cls("location")),
+        "jd_text": _container_text(
+            page, SoupStrainer("div", attrs={"class": _cls("section")}), drop=_cls("last-section-apply")
+        ),
+    }
+
+
+def _ashby_app_state(page: str) -> Dict[str, str]:
+    # jobs.ashbyhq.com (SPA): server-rendered window.__appData holds the posting
+    data = _embedded_json(page, "window.__appData")
+    if not isinstance(data, dict):
+        return {}
+    post = data.get("posting") or {}
+    if not isinstance(post, dict):
+        return {}
+    body = post.get("descriptionHtml")
+    return {
+        "title": str(post.get("title") or ""),
+        "company": _name(data.get("organization")),
+        "location": str(post.get("locationName") or ""),
+        "jd_text": fragment_text(body) if body else normalize_text(str(post.get("descriptionPlainText") or "")),
+    }
+
+
+def _workable_dom(page: str) -> Dict[str, str]:
+    # apply.workable.com: blocks tagged data-ui="job-title" / "job-description" / "job-requirements" ...
+    soup = _strained(page, SoupStrainer(attrs={"data-ui": re.compile(r"^job-")}))
+    body = soup.find_all(attrs={"data-ui": re.compile(r"^job-(description|requirements|benefits)$")})
+    return {
+        "title": _first_text(soup, attrs={"data-ui": "job-title"}),
+        "location": _first_text(soup, attrs={"data-ui": "job-location"}),
+        "jd_text": normalize_text("\n".join(el.get_text("\n", strip=True) for el in body)),
+    }
+
+
+def _page_title(page: str) -> Dict[str, str]:
+    """First h1/h2 only (strained parse)."""
+    head = _strained(page, SoupStrainer(["h1", "h2"]))
+    return {"title": _first_text(head, name=["h1", "h2"])}
+
+
+def _full_page(page: str) -> Dict[str, str]:
+    """Last resort: whole-page parse + main-content isolation."""
+    return {**_page_title(page), "jd_text": extract_main_text(page)}
+
+
+_EXTRACTORS: Dict[str, List[Tuple[str, Callable[[str], Dict[str, str]]]]] = {
+    "greenhouse": [("jsonld", _jsonld), ("app_state", _greenhouse_app_state), ("dom", _greenhouse_dom)],
+    "lever": [("jsonld", _jsonld), ("dom", _lever_dom)],
+    "ashby": [("app_state", _ashby_app_state), ("jsonld", _jsonld)],
+    "workable": [("jsonld", _jsonld), ("dom", _workable_dom)],
+}
+_GENERIC = [("jsonld", _jsonld)]
+_FIELDS = ("title", "company", "location")
+
+
+def parse_job_html(page: str, url: str = "") -> dict:
+    """
+    Title, company, location and posting text, via the extractors for the URL's ATS
+    (see ats_detect). "extractor" names the strategy that supplied jd_text.
+    """
+    ats = detect_ats(url) if url else "unknown"
+    details = {"title": "", "company": "", "location": "", "jd_text": "", "extractor": ""}
+    for name, extract in _EXTRACTORS.get(ats, _GENERIC) + [("full_page", _full_page)]:
+        if name == "full_page" and details["jd_text"]:
+            extract = _page_title  # text already extracted; skip the whole-page parse
+        try:
+            found = extract(page)
+        except Exception:
+            continue
+        for key in _FIELDS:
+            details[key] = details[key] or (found.get(key) or "").strip()
+        if found.get("jd_text") and not details["jd_text"]:
+            details["jd_text"] = found["jd_text"]
+            details["extractor"] = f"{ats}:{name}"
+        if details["jd_text"] and details["title"]:
+            break
+    return details
+
+
+async def fetch_job_details(url: str) -> dict:
+    # Grab the HTML (follow redirects; many ATS links redirect)
+    r = await http_get(url, follow_redirects=True)
+    r.raise_for_status()
+    return parse_job_html(r.text, str(r.url))
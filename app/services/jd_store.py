@@ -0,0 +1,164 @@
+# app/services/jd_store.py
+"""
+Per-job JD snapshots: the posting page fetched once, then revalidated.
+
+A snapshot younger than JD_SNAPSHOT_TTL_HOURS is used as-is (no request).
+Older ones are refetched with If-None-Match / If-Modified-Since; a 304 only
+bumps checked_at, a 200 re-extracts the text. Extracted text lives in
+jd_texts keyed by its hash, so identical postings across jobs are stored
+(and compared) once; raw HTML is kept zlib-compressed for re-parsing.
+
+Batches (fetch_jd_snapshots) read snapshot rows first, run only the HTTP
+requests concurrently, then write every result serially on the one Session.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import httpx
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import JDSnapshot, JDText, Job
+from ..utils.http import http_get
+from .jd_parser import parse_job_html
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def compress_html(html: str) -> bytes:
+    return zlib.compress(html.encode("utf-8"), 6)
+
+
+def decompress_html(blob: Optional[bytes]) -> str:
+    return zlib.decompress(blob).decode("utf-8") if blob else ""
+
+
+def _is_fresh(snap: JDSnapshot, max_age_hours: Optional[float]) -> bool:
+    ttl = settings.jd_snapshot_ttl_hours if max_age_hours is None else max_age_hours
+    return datetime.utcnow() - snap.checked_at <= timedelta(hours=ttl)
+
+
+def _conditional_headers(snap: Optional[JDSnapshot]) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    if snap is not None and snap.etag:
+        headers["If-None-Match"] = snap.etag
+    if snap is not None and snap.last_modified:
+        headers["If-Modified-Since"] = snap.last_modified
+    return headers
+
+
+def _store_text(db: Session, text: str) -> str:
+    h = text_hash(text)
+    if db.get(JDText, h) is None:
+        db.add(JDText(hash=h, text=text))
+        db.flush()  # visible to db.get for other jobs in this batch
+    return h
+
+
+def _result(snap: JDSnapshot, text: str, status: str) -> Dict[str, Any]:
+    return {"title": snap.title, "jd_text": text, "hash": snap.text_hash, "status": status}
+
+
+def _stored_text(db: Session, snap: JDSnapshot) -> str:
+    return db.get(JDText, snap.text_hash).text
+
+
+def _snapshot(db: Session, job: Job) -> Optional[JDSnapshot]:
+    return db.query(JDSnapshot).filter(JDSnapshot.job_id == job.id).one_or_none()
+
+
+async def fetch_jd_page(url: str, headers: Dict[str, str]) -> httpx.Response:
+    """The (conditional) GET alone: no Session access, safe to gather."""
+    r = await http_get(url, headers=headers, follow_redirects=True)
+    if r.status_code == 304 and not headers:
+        # nothing was asked to be revalidated, so there is no copy to reuse
+        raise httpx.HTTPStatusError("304 without a conditional request", request=r.request, response=r)
+    if r.status_code != 304:
+        r.raise_for_status()
+    return r
+
+
+def _save_page(
+    db: Session, job: Job, snap: Optional[JDSnapshot], page: Union[httpx.Response, BaseException]
+) -> Dict[str, Any]:
+    """Record one fetch outcome (not committed); re-raises a failed fetch when there is no old copy."""
+    if isinstance(page, BaseException):
+        if snap is None:
+            raise page
+        # stale beats nothing: keep serving the old copy until the page answers again
+        return _result(snap, _stored_text(db, snap), "stale")
+
+    r = page
+    now = datetime.utcnow()
+    if r.status_code == 304:  # only ever sent with a snapshot's validators
+        snap.checked_at = now
+        return _result(snap, _stored_text(db, snap), "not_modified")
+
+    details = parse_job_html(r.text, str(r.url))
+    text = details.get("jd_text", "")
+    h = _store_text(db, text)
+    if snap is None:
+        snap = JDSnapshot(job_id=job.id)
+        db.add(snap)
+    elif snap.text_hash != h and not job.description:
+        job.jd_digest = None  # the posting changed; its digest is stale
+    snap.url = str(r.url)[:1000]
+    snap.title = (details.get("title") or "")[:200]
+    snap.html_gz = compress_html(r.text) if settings.jd_snapshot_keep_html else None
+    snap.text_hash = h
+    snap.etag = r.headers.get("etag", "")[:256]
+    snap.last_modified = r.headers.get("last-modified", "")[:64]
+    snap.fetched_at = snap.checked_at = now
+    return _result(snap, text, "fetched")
+
+
+async def fetch_jd_snapshot(db: Session, job: Job, max_age_hours: Optional[float] = None) -> Dict[str, Any]:
+    """
+    {"title", "jd_text", "hash", "status"} for a job's posting, where status is
+    "cached" (within TTL), "not_modified" (304), "fetched" (200) or "stale"
+    (refetch failed; the old copy is served). Raises if there is no old copy.
+    """
+    snap = _snapshot(db, job)
+    if snap is not None and _is_fresh(snap, max_age_hours):
+        return _result(snap, _stored_text(db, snap), "cached")
+    try:
+        page: Union[httpx.Response, BaseException] = await fetch_jd_page(job.url, _conditional_headers(snap))
+    except Exception as e:
+        page = e
+    result = _save_page(db, job, snap, page)
+    db.commit()
+    return result
+
+
+async def fetch_jd_snapshots(
+    db: Session, jobs: Iterable[Job], max_age_hours: Optional[float] = None
+) -> Dict[int, Union[Dict[str, Any], BaseException]]:
+    """
+    fetch_jd_snapshot for many jobs: {job id: result, or the exception for
+    that job}. Only the requests run concurrently; reads and writes are serial.
+    """
+    out: Dict[int, Union[Dict[str, Any], BaseException]] = {}
+    todo: List[Tuple[Job, Optional[JDSnapshot], str, Dict[str, str]]] = []
+    for job in jobs:
+        snap = _snapshot(db, job)
+        if snap is not None and _is_fresh(snap, max_age_hours):
+            out[job.id] = _result(snap, _stored_text(db, snap), "cached")
+        else:
+            todo.append((job, snap, job.url, _conditional_headers(snap)))
+
+    pages = await asyncio.gather(*(fetch_jd_page(url, headers) for _, _, url, headers in todo), return_exceptions=True)
+
+    for (job, snap, _, _), page in zip(todo, pages):
+        try:
+            out[job.id] = _save_page(db, job, snap, page)
+        except Exception as e:
+            out[job.id] = e
+    db.commit()
+    return out
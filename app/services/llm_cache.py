@@ -0,0 +1,135 @@
+# app/services/llm_cache.py
+"""
+SQLite cache for model responses (used by ai.chat_text / ai.chat_json).
+
+Key: sha256 of (kind, model, system prompt, user prompt, temperature), so a
+re-run batch, a retried job, or simulate → submit replays identical prompts
+from disk instead of spending latency and quota. Entries expire after
+LLM_CACHE_TTL_HOURS; past LLM_CACHE_MAX_ENTRIES the least recently used go.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ..config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    kind        TEXT NOT NULL,
+    model       TEXT NOT NULL,
+    response    TEXT NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_last_access ON responses (last_access);
+"""
+
+# trim at most once per this many writes; LRU order is kept exact by last_access
+_EVICT_EVERY = 50
+
+
+def llm_cache_key(kind: str, model: str, system: str, user: str, temperature: float) -> str:
+    raw = json.dumps([kind, model, system, user, round(float(temperature), 4)], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Thread-safe sqlite response cache with TTL and LRU trimming."""
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE responses SET hits = hits + 1, last_access = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, kind: str, model: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, kind, model, response, hits, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?)",
+                (key, kind, model, response, now, now),
+            )
+            self._writes += 1
+            if self._writes % _EVICT_EVERY == 0:
+                self._trim_locked(now)
+
+    def _trim_locked(self, now: float) -> None:
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, hits_total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits_total": hits_total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Process-wide cache, or None when LLM_CACHE_ENABLED is off."""
+    global _cache
+    if not settings.llm_cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            settings.cache_path.mkdir(parents=True, exist_ok=True)
+            _cache = LLMCache(
+                str(settings.cache_path / "llm_cache.sqlite3"),
+                settings.llm_cache_ttl_hours * 3600,
+                settings.llm_cache_max_entries,
+            )
+        return _cache
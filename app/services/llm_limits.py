@@ -0,0 +1,201 @@
+# app/services/llm_limits.py
+"""
+Quota-aware limits for model calls: a requests/min + tokens/min token bucket,
+bounded concurrency, and jittered retry backoff for 429 / 5xx.
+
+The buckets are plain thread-safe counters (reserve now, sleep the returned
+delay), so sync callers, threadpool workers and any number of event loops
+share one quota. Concurrency slots work the same way: one counter behind a
+threading lock for every caller. A sync caller waits on a threading.Event;
+an async caller waits on a future of its own loop, which release() resolves
+with call_soon_threadsafe, so a waiting coroutine never blocks its loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+import httpx
+
+from ..config import settings
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute; reserve() may go into debt and returns the wait."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, float(per_minute))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount: float) -> None:
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """RPM and TPM buckets; a call waits for whichever is further behind."""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.waited_s = 0.0
+
+    def _reserve(self, est_tokens: int) -> float:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(est_tokens))
+        self.waited_s += wait
+        return wait
+
+    def acquire(self, est_tokens: int) -> None:
+        wait = self._reserve(est_tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, est_tokens: int) -> None:
+        wait = self._reserve(est_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def settle(self, est_tokens: int, used_tokens: Optional[int]) -> None:
+        """Give back (or charge) the difference once the real usage is known."""
+        if used_tokens:
+            self.tokens.refund(est_tokens - used_tokens)
+
+
+class ConcurrencyLimit:
+    """
+    Counting semaphore shared by threads and event loops. Use `with` from sync
+    code and `async with` from coroutines; freed slots go to waiters in FIFO order.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = max(1, int(slots))
+        self._free = self.slots
+        self._lock = threading.Lock()
+        # each waiter is a wake-up callable; False means it can't take the slot
+        self._waiters: Deque[Callable[[], bool]] = deque()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            granted = threading.Event()
+
+            def wake() -> bool:
+                granted.set()
+                return True
+
+            self._waiters.append(wake)
+        granted.wait()
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            granted = loop.create_future()
+
+            def wake() -> bool:
+                try:
+                    loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+                except RuntimeError:  # that loop has closed
+                    return False
+                return True
+
+            self._waiters.append(wake)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                handed_over = wake not in self._waiters
+                if not handed_over:
+                    self._waiters.remove(wake)
+            if handed_over:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Hand the slot straight to the oldest waiter, or return it to the pool."""
+        while True:
+            with self._lock:
+                if not self._waiters:
+                    self._free = min(self.slots, self._free + 1)
+                    return
+                wake = self._waiters.popleft()
+            if wake():
+                return
+
+    def __enter__(self) -> "ConcurrencyLimit":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    async def __aenter__(self) -> "ConcurrencyLimit":
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.release()
+
+
+# ---------- retries ----------
+def status_code(exc: BaseException) -> Optional[int]:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    code = status_code(exc)
+    if code is not None:
+        return code == 429 or 500 <= code < 600
+    # transport-level failures (timeouts, resets) carry no status
+    return isinstance(exc, (TimeoutError, ConnectionError, httpx.TransportError))
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2^attempt))."""
+    ceiling = min(settings.llm_retry_max_seconds, settings.llm_retry_base_seconds * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+# ---------- shared instances ----------
+_limiter: Optional[RateLimiter] = None
+_slots: Optional[ConcurrencyLimit] = None
+_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = RateLimiter(settings.llm_rpm, settings.llm_tpm)
+        return _limiter
+
+
+def llm_slots() -> ConcurrencyLimit:
+    """The LLM_MAX_CONCURRENCY slots shared by sync calls and every event loop."""
+    global _slots
+    with _lock:
+        if _slots is None:
+            _slots = ConcurrencyLimit(settings.llm_max_concurrency)
+        return _slots
@@ -0,0 +1,115 @@
+# app/services/packages.py
+"""
+Application packages: a tailored resume plus cover letter for one job.
+
+One model call produces both contexts (tailoring.generate_package_context) and
+both PDFs render back to back on a single browser page, so a package costs
+about what a lone resume render did.
+"""
+from __future__ import annotations
+
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..config import settings
+from ..models import Application
+from .doc_gen import html_to_pdf_batch, html_to_pdf_batch_async, render_resume_html, render_template
+from .tailoring import agenerate_package_context, generate_package_context
+
+
+def package_docs(ctxs: Dict[str, Dict[str, Any]]) -> List[Tuple[str, Optional[str]]]:
+    """(html, out_path) pairs for the batch renderers: resume first, then cover letter."""
+    return [
+        (render_resume_html(ctxs["resume"]), None),
+        (render_template("cover.html.j2", ctxs["cover"]), None),
+    ]
+
+
+def package_result(rendered: Sequence[Dict[str, Any]], timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Shape two batch results into a package; a failed resume is an error, a failed cover is not."""
+    resume, cover = rendered
+    if not resume["ok"]:
+        raise RuntimeError(f"resume render failed: {resume['error']}")
+    return {
+        "resume_pdf": resume["out_path"],
+        "cover_pdf": cover["out_path"] if cover["ok"] else None,
+        "cover_error": cover["error"],
+        "timings_ms": {
+            **(timings or {}),
+            "resume": resume["ms"],
+            "cover": cover["ms"],
+        },
+    }
+
+
+def _ms(t0: float, t1: float) -> float:
+    return round((t1 - t0) * 1000, 1)
+
+
+def build_package(
+    profile: Dict[str, Any],
+    jd_text: str,
+    exp_bank: List[Dict[str, str]],
+    company: str = "",
+    role: str = "",
+) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    ctxs = generate_package_context(profile, jd_text, exp_bank, company, role)
+    t1 = time.perf_counter()
+    rendered = html_to_pdf_batch(package_docs(ctxs))
+    return package_result(rendered, {"tailor": _ms(t0, t1), "render": _ms(t1, time.perf_counter())})
+
+
+async def build_package_async(
+    profile: Dict[str, Any],
+    jd_text: str,
+    exp_bank: List[Dict[str, str]],
+    company: str = "",
+    role: str = "",
+) -> Dict[str, Any]:
+    """build_package on the async LLM client (shares the global rate limits)."""
+    t0 = time.perf_counter()
+    ctxs = await agenerate_package_context(profile, jd_text, exp_bank, company, role)
+    t1 = time.perf_counter()
+    rendered = await html_to_pdf_batch_async(package_docs(ctxs), concurrency=1)
+    return package_result(rendered, {"tailor": _ms(t0, t1), "render": _ms(t1, time.perf_counter())})
+
+
+# ---------- Application columns ----------
+def doc_ref(pdf_path: Optional[str], default: str = "") -> str:
+    """Short reference for a generated PDF: its path under doc_out_dir (fits the String(120) columns)."""
+    if not pdf_path:
+        return default
+    try:
+        return Path(pdf_path).resolve().relative_to(settings.doc_out_path.resolve()).as_posix()
+    except ValueError:
+        return default
+
+
+def keep_pdf(pdf_path: Optional[str]) -> Optional[str]:
+    """
+    Copy a PDF out of the render cache (which evicts LRU) into
+    <doc_out_dir>/applied/, keeping the content-addressed name; other paths
+    are returned as-is.
+    """
+    if not pdf_path:
+        return pdf_path
+    src = Path(pdf_path)
+    try:
+        src.resolve().relative_to((settings.doc_out_path / "pdf_cache").resolve())
+    except ValueError:
+        return pdf_path
+    dest = settings.doc_out_path / "applied" / src.name
+    if not dest.exists():
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(src, dest)
+    return str(dest)
+
+
+def attach_package(app_row: Application, package: Optional[Dict[str, Any]], resume_default: str = "") -> None:
+    """Record the package's PDFs on resume_version / cover_letter_version, copied out of the cache."""
+    package = package or {}
+    app_row.resume_version = doc_ref(keep_pdf(package.get("resume_pdf")), resume_default)
+    app_row.cover_letter_version = doc_ref(keep_pdf(package.get("cover_pdf")))
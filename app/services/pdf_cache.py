@@ -0,0 +1,148 @@
+# app/services/pdf_cache.py
+"""
+Content-addressed store for rendered PDFs.
+
+The key is sha256(render options + HTML), so a byte-identical render (a
+simulate followed by a submit, a re-run of the same job) is a lookup instead
+of a browser round trip. Files live at <doc_out_dir>/pdf_cache/<kk>/<key>.pdf;
+a small sqlite index tracks size, hits and last access, and least-recently
+used entries are evicted once the store grows past PDF_CACHE_MAX_MB.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from ..config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdfs (
+    key         TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_pdfs_last_access ON pdfs (last_access);
+"""
+
+
+def pdf_cache_key(html: str, options: Dict[str, Any]) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps(options, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    h.update(b"\0")
+    h.update(html.encode("utf-8"))
+    return h.hexdigest()
+
+
+class PdfCache:
+    """sqlite-indexed PDF store; safe to share across threads."""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        (root / "tmp").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(root / "index.sqlite3"), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def _final_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pdf"
+
+    def staging_path(self, key: str) -> Path:
+        """Unique temp path to render into; commit() moves it into place."""
+        return self.root / "tmp" / f"{key}.{uuid4().hex[:8]}.pdf"
+
+    def lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT path FROM pdfs WHERE key = ?", (key,)).fetchone()
+            if row and Path(row[0]).exists():
+                self._db.execute(
+                    "UPDATE pdfs SET hits = hits + 1, last_access = ? WHERE key = ?", (time.time(), key)
+                )
+                self.hits += 1
+                return row[0]
+            if row:  # file removed behind our back
+                self._db.execute("DELETE FROM pdfs WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+
+    def commit(self, key: str, rendered: Path) -> str:
+        """Move a freshly rendered file into the store, index it, and evict if over budget."""
+        final = self._final_path(key)
+        final.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(rendered, final)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO pdfs (key, path, size, hits, created_at, last_access) VALUES (?, ?, ?, 0, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET path = excluded.path, size = excluded.size, "
+                "last_access = excluded.last_access",
+                (key, str(final), final.stat().st_size, now, now),
+            )
+            self._evict_locked(keep=key)
+        return str(final)
+
+    def _evict_locked(self, keep: str) -> int:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pdfs").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        for key, path, size in self._db.execute(
+            "SELECT key, path, size FROM pdfs WHERE key != ? ORDER BY last_access", (keep,)
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                Path(path).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue  # e.g. open elsewhere on Windows; retry on a later commit
+            self._db.execute("DELETE FROM pdfs WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size, hits = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM pdfs"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits_total": hits,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_cache: Optional[PdfCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_pdf_cache() -> Optional[PdfCache]:
+    """Process-wide cache, or None when PDF_CACHE_ENABLED is off."""
+    global _cache
+    if not settings.pdf_cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = PdfCache(
+                settings.doc_out_path / "pdf_cache",
+                int(settings.pdf_cache_max_mb * 1024 * 1024),
+            )
+        return _cache
@@ -0,0 +1,170 @@
+# app/services/qa_index.py
+"""
+In-process BM25 index over QABank (question + answer + tags), one per qa_pack_id.
+
+Prompts get only the experience rows relevant to the JD and to each question,
+so prompt size stays bounded however large the bank grows. Indexes are built
+on first use, dropped by invalidate_qa_index() when /qa adds rows, and also
+rebuilt if the pack's (row count, max id) signature changed underneath us
+(e.g. rows added by another worker).
+"""
+from __future__ import annotations
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import QABank
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how i in is it its me my of on or our "
+    "the their this to was we what when where which who why will with you your".split()
+)
+
+# BM25 parameters (Robertson defaults)
+_K1 = 1.2
+_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return [t.rstrip(".") for t in _TOKEN.findall((text or "").lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+class QAIndex:
+    """
+    BM25 over one pack. Postings are stored as flat NumPy arrays per term with
+    the length-normalised term weight precomputed, so a query is a handful of
+    np.add.at calls regardless of bank size.
+    """
+
+    def __init__(self, pack_id: str, rows: Sequence[QABank], signature: Tuple[int, int]):
+        self.pack_id = pack_id
+        self.signature = signature
+        self.rows = [
+            {"id": r.id, "question": r.question, "base_answer": r.base_answer, "tags": r.tags}
+            for r in rows
+        ]
+        docs = [
+            # tags are curated keywords: count them twice
+            tokenize(f"{r.question} {r.base_answer} {r.tags} {r.tags}")
+            for r in rows
+        ]
+        n = len(docs)
+        lengths = np.array([len(d) for d in docs], dtype=np.float32)
+        avgdl = float(lengths.mean()) if n else 0.0
+
+        postings: Dict[str, Dict[int, int]] = {}
+        for i, doc in enumerate(docs):
+            for tok in doc:
+                tf = postings.setdefault(tok, {})
+                tf[i] = tf.get(i, 0) + 1
+
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for tok, tf_map in postings.items():
+            idx = np.fromiter(tf_map.keys(), dtype=np.int32, count=len(tf_map))
+            tf = np.fromiter(tf_map.values(), dtype=np.float32, count=len(tf_map))
+            df = len(tf_map)
+            idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            norm = _K1 * (1.0 - _B + _B * lengths[idx] / (avgdl or 1.0))
+            self._postings[tok] = (idx, (idf * tf * (_K1 + 1.0) / (tf + norm)).astype(np.float32))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def scores(self, query: str) -> np.ndarray:
+        out = np.zeros(len(self.rows), dtype=np.float32)
+        for tok in set(tokenize(query)):
+            hit = self._postings.get(tok)
+            if hit is not None:
+                np.add.at(out, hit[0], hit[1])
+        return out
+
+    def search(self, query: str, k: int) -> List[Tuple[Dict, float]]:
+        """Top-k rows with a positive score, best first."""
+        if not self.rows or k <= 0:
+            return []
+        s = self.scores(query)
+        k = min(k, len(s))
+        top = np.argpartition(-s, k - 1)[:k]
+        top = top[np.argsort(-s[top])]
+        return [(self.rows[i], float(s[i])) for i in top if s[i] > 0]
+
+    def select(
+        self,
+        jd_text: str = "",
+        questions: Iterable[str] = (),
+        k_jd: Optional[int] = None,
+        k_question: Optional[int] = None,
+        max_rows: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Union of the JD's top rows and each question's top rows, capped at
+        max_rows. If nothing matches, the first max_rows rows (bank order).
+        """
+        k_jd = settings.qa_top_k_jd if k_jd is None else k_jd
+        k_question = settings.qa_top_k_question if k_question is None else k_question
+        max_rows = settings.qa_max_rows if max_rows is None else max_rows
+        if len(self.rows) <= max_rows:
+            return list(self.rows)  # small bank: everything fits
+
+        picked: Dict[int, Dict] = {}
+        # questions first: a specific question's evidence matters more than general JD overlap
+        for q in questions:
+            for row, _ in self.search(q, k_question):
+                picked.setdefault(row["id"], row)
+        if jd_text:
+            for row, _ in self.search(jd_text, k_jd):
+                picked.setdefault(row["id"], row)
+        if not picked:
+            return list(self.rows[:max_rows])  # no overlap at all: don't send an empty bank
+        return list(picked.values())[:max_rows]
+
+
+# ---------- per-pack cache ----------
+_indexes: Dict[str, QAIndex] = {}
+_lock = threading.Lock()
+
+
+def _signature(db: Session, pack_id: str) -> Tuple[int, int]:
+    count, max_id = db.query(func.count(QABank.id), func.max(QABank.id)).filter(
+        QABank.qa_pack_id == pack_id
+    ).one()
+    return int(count or 0), int(max_id or 0)
+
+
+def get_qa_index(db: Session, pack_id: str = "default") -> QAIndex:
+    sig = _signature(db, pack_id)
+    with _lock:
+        idx = _indexes.get(pack_id)
+        if idx is not None and idx.signature == sig:
+            return idx
+    rows = db.query(QABank).filter(QABank.qa_pack_id == pack_id).order_by(QABank.id).all()
+    idx = QAIndex(pack_id, rows, sig)
+    with _lock:
+        _indexes[pack_id] = idx
+    return idx
+
+
+def invalidate_qa_index(pack_id: Optional[str] = None) -> None:
+    with _lock:
+        if pack_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(pack_id, None)
+
+
+def relevant_experience(
+    db: Session,
+    pack_id: str = "default",
+    jd_text: str = "",
+    questions: Iterable[str] = (),
+) -> List[Dict[str, str]]:
+    """Experience-bank entries (tailoring's {base_answer, tags} shape) relevant to this JD/questions."""
+    rows = get_qa_index(db, pack_id).select(jd_text=jd_text, questions=questions)
+    return [{"base_answer": r["base_answer"], "tags": r["tags"]} for r in rows]
@@ -1,21 +1,141 @@
-from typing import List, Dict
+import html
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Tuple, Any
+from urllib.parse import urlparse, parse_qs
 import httpx
 
+from ...config import settings
+from ...utils.http import get_sync_http_client, http_get
+from ..jd_parser import fragment_text
+
+
+def _utc(raw: Optional[str]) -> Optional[datetime]:
+    """ISO timestamp with offset -> naive UTC (the models store utcnow-style times)."""
+    try:
+        ts = datetime.fromisoformat(raw or "")
+    except ValueError:
+        return None
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+
+
 # Public JSON API: https://boards-api.greenhouse.io/v1/boards/{company}/jobs
+# content=true inlines every posting's description (HTML-escaped) and departments,
+# so one call per board replaces a page download per job.
 async def fetch_greenhouse_company_jobs(company: str) -> List[Dict]:
-    url = f"https://boards-api.greenhouse.io/v1/boards/{company}/jobs"
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(url)
-        r.raise_for_status()
+    url = f"{settings.greenhouse_api_base}/boards/{company}/jobs"
+    r = await http_get(url, params={"content": "true"})
+    r.raise_for_status()
     data = r.json().get("jobs", [])
     results = []
     for j in data:
+        departments = [d.get("name", "") for d in (j.get("departments") or []) if d.get("name")]
         results.append({
             "source": "greenhouse",
-            "company": j.get("departments", [{}])[0].get("name", "") or company,
+            "company": company,
             "title": j.get("title", ""),
             "location": (j.get("location") or {}).get("name", ""),
             "url": j.get("absolute_url", ""),
             "ats_type": "greenhouse",
+            "department": ", ".join(departments),
+            "external_id": str(j.get("id") or ""),
+            "updated_at": _utc(j.get("updated_at")),
+            "description": fragment_text(html.unescape(j.get("content") or "")),
         })
     return results
+
+
+# ---------- application questions (no browser) ----------
+# GET /v1/boards/{board}/jobs/{id}?questions=true returns every form question
+# with its field name, type, required flag and select values.
+
+_GH_HOSTS = ("boards.greenhouse.io", "job-boards.greenhouse.io")
+
+# paste-in alternatives to the file uploads; hidden behind a toggle on the form
+_HIDDEN_TEXT_FIELDS = {"resume_text", "cover_letter_text"}
+
+_FIELD_KINDS = {
+    "input_text": "text",
+    "input_file": "file",
+    "textarea": "textarea",
+    "multi_value_single_select": "select",
+    "multi_value_multi_select": "multiselect",
+}
+
+
+def greenhouse_job_ref(url: str, company_slug: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """(board token, job id) from a posting, embed or wrapper (?gh_jid=) URL."""
+    u = urlparse(url)
+    q = parse_qs(u.query or "")
+    parts = [p for p in u.path.split("/") if p]
+
+    board = (q.get("for") or [None])[0]
+    if not board and u.netloc in _GH_HOSTS and parts and parts[0] not in {"embed", "v1"}:
+        board = parts[0]
+    board = board or company_slug or None
+
+    job_id = (q.get("gh_jid") or q.get("token") or [None])[0]
+    if not job_id:
+        job_id = next((p for p in parts if p.isdigit()), None)
+    return board, job_id
+
+
+def parse_greenhouse_questions(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Map the boards API question list onto connectors/forms.py field descriptors."""
+    out: List[Dict[str, Any]] = []
+    groups = (payload.get("questions") or []) + (payload.get("location_questions") or [])
+    for qn in groups:
+        label = (qn.get("label") or "").strip()
+        for f in qn.get("fields") or []:
+            ftype = f.get("type", "")
+            if ftype == "input_hidden":
+                continue
+            name = f.get("name", "")
+            kind = _FIELD_KINDS.get(ftype, ftype or "text")
+            if kind == "text" and name == "email":
+                kind = "email"
+            elif kind == "text" and name == "phone":
+                kind = "tel"
+            out.append({
+                "kind": kind,
+                "name": name,
+                "id": "",
+                "label": label,
+                "required": bool(qn.get("required")),
+                "options": [
+                    {"value": str(v.get("value", "")), "label": v.get("label", "")}
+                    for v in (f.get("values") or [])
+                ],
+                "selector": "",  # DOM names differ from API names; submit rediscovers live
+                "visible": name not in _HIDDEN_TEXT_FIELDS,
+            })
+    return out
+
+
+def _questions_url(board: str, job_id: str) -> str:
+    return f"{settings.greenhouse_api_base}/boards/{board}/jobs/{job_id}?questions=true"
+
+
+async def fetch_greenhouse_questions(url: str, company_slug: Optional[str] = None) -> Optional[List[Dict]]:
+    """Field descriptors from the boards API, or None if the API can't answer."""
+    board, job_id = greenhouse_job_ref(url, company_slug)
+    if not board or not job_id:
+        return None
+    try:
+        r = await http_get(_questions_url(board, job_id), timeout=10)
+        r.raise_for_status()
+        return parse_greenhouse_questions(r.json()) or None
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+def fetch_greenhouse_questions_sync(url: str, company_slug: Optional[str] = None) -> Optional[List[Dict]]:
+    """fetch_greenhouse_questions for sync callers (connector, batch engine)."""
+    board, job_id = greenhouse_job_ref(url, company_slug)
+    if not board or not job_id:
+        return None
+    try:
+        r = get_sync_http_client().get(_questions_url(board, job_id), timeout=10)
+        r.raise_for_status()
+        return parse_greenhouse_questions(r.json()) or None
+    except (httpx.HTTPError, ValueError):
+        return None
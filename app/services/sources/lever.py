@@ -1,21 +1,48 @@
-from typing import List, Dict
-import httpx
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ...utils.http import http_get
+from ..jd_parser import fragment_text, normalize_text
+
+
+def _utc_ms(ms: Any) -> Optional[datetime]:
+    try:
+        return datetime.utcfromtimestamp(int(ms) / 1000)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def lever_description(j: Dict[str, Any]) -> str:
+    """Posting text from mode=json fields: intro, each titled list, closing."""
+    parts = [j.get("descriptionPlain") or ""]
+    for lst in j.get("lists") or []:
+        parts.append(lst.get("text") or "")
+        parts.append(fragment_text(lst.get("content") or ""))
+    parts.append(j.get("additionalPlain") or "")
+    return normalize_text("\n".join(p for p in parts if p))
+
 
 # Public JSON API: https://api.lever.co/v0/postings/{company}?mode=json
+# (one call returns every posting with its description, lists and team)
 async def fetch_lever_company_jobs(company: str) -> List[Dict]:
     url = f"https://api.lever.co/v0/postings/{company}?mode=json"
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(url)
-        r.raise_for_status()
+    r = await http_get(url)
+    r.raise_for_status()
     data = r.json()
     results = []
     for j in data:
+        categories = j.get("categories") or {}
         results.append({
             "source": "lever",
-            "company": j.get("categories", {}).get("team", "") or company,
+            "company": company,
             "title": j.get("text", ""),
-            "location": j.get("categories", {}).get("location", ""),
+            "location": categories.get("location", ""),
             "url": j.get("hostedUrl", ""),
             "ats_type": "lever",
+            "department": " / ".join(x for x in (categories.get("department"), categories.get("team")) if x),
+            "external_id": str(j.get("id") or ""),
+            # updatedAt when present (undocumented in the postings API), else createdAt
+            "updated_at": _utc_ms(j.get("updatedAt") or j.get("createdAt")),
+            "description": lever_description(j),
         })
     return results
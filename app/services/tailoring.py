@@ -1,25 +1,34 @@
 # app/services/tailoring.py
 from __future__ import annotations
+import asyncio
+from datetime import date
 from typing import List, Dict, Any
-from .ai import chat_json, chat_text
+from .ai import achat_json, achat_text, chat_json, chat_text
 
 RESUME_SYSTEM = (
     "You are a resume writer that tailors content ONLY from the provided profile "
     "and experience bank. Never invent companies, titles, dates, or metrics."
 )
 
+PACKAGE_SYSTEM = (
+    "You are a resume and cover letter writer that tailors content ONLY from the provided "
+    "profile and experience bank. Never invent companies, titles, dates, or metrics."
+)
+
 ANSWER_SYSTEM = (
     "You answer job application questions truthfully and concisely (3–5 sentences), "
     "using ONLY the facts in 'profile' and 'experience bank'. If details are missing, "
     "stay general and skills-focused. Do NOT invent past employers or dates."
 )
 
-def generate_resume_context(profile: Dict[str, Any], jd_text: str, experience_bank: List[Dict[str, str]]) -> Dict[str, Any]:
-    """
-    Returns dict for templates/resume.html.j2:
-    name, email, phone, location, summary, skills[list], experience[list of {role,company,years,bullets[list]}]
-    """
-    exp_text = "\n".join([f"- {x.get('base_answer','')}" for x in experience_bank])
+# Each generator is split into a prompt builder and a result shaper so the
+# sync and async (a*) variants send identical prompts (and share LLM cache entries).
+
+def _exp_text(experience_bank: List[Dict[str, str]]) -> str:
+    return "\n".join([f"- {x.get('base_answer','')}" for x in experience_bank])
+
+def _resume_prompt(profile: Dict[str, Any], jd_text: str, experience_bank: List[Dict[str, str]]) -> str:
+    exp_text = _exp_text(experience_bank)
     user = f"""
 PROFILE:
 name: {profile.get('name','')}
@@ -31,7 +40,7 @@ core_skills: {', '.join(profile.get('skills', []))}
 EXPERIENCE BANK (verbatim):
 {exp_text}
 
-JOB DESCRIPTION (verbatim):
+JOB DESCRIPTION:
 {jd_text}
 
 Return strict JSON with:
@@ -44,7 +53,9 @@ Return strict JSON with:
   ]
 }}
 """
-    data = chat_json(RESUME_SYSTEM, user)
+    return user
+
+def _resume_context(profile: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "name": profile.get("name","Your Name"),
         "email": profile.get("email","you@example.com"),
@@ -55,18 +66,130 @@ Return strict JSON with:
         "experience": data.get("experience", []),
     }
 
-def draft_answers(questions: List[str], profile: Dict[str, Any], experience_bank: List[Dict[str,str]], jd_text: str) -> Dict[str,str]:
-    exp_text = "\n".join([f"- {x.get('base_answer','')}" for x in experience_bank])
-    result: Dict[str,str] = {}
-    for q in questions:
-        user = f"""
+def generate_resume_context(profile: Dict[str, Any], jd_text: str, experience_bank: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Returns dict for templates/resume.html.j2:
+    name, email, phone, location, summary, skills[list], experience[list of {role,company,years,bullets[list]}]
+    """
+    data = chat_json(RESUME_SYSTEM, _resume_prompt(profile, jd_text, experience_bank))
+    return _resume_context(profile, data)
+
+async def agenerate_resume_context(profile: Dict[str, Any], jd_text: str, experience_bank: List[Dict[str, str]]) -> Dict[str, Any]:
+    data = await achat_json(RESUME_SYSTEM, _resume_prompt(profile, jd_text, experience_bank))
+    return _resume_context(profile, data)
+
+def _contact(profile: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": profile.get("name","Your Name"),
+        "email": profile.get("email","you@example.com"),
+        "phone": profile.get("phone","+1-555-000-0000"),
+        "location": profile.get("location",""),
+    }
+
+def _package_prompt(
+    profile: Dict[str, Any],
+    jd_text: str,
+    experience_bank: List[Dict[str, str]],
+    company: str,
+    role: str,
+) -> str:
+    exp_text = _exp_text(experience_bank)
+    user = f"""
+PROFILE:
+name: {profile.get('name','')}
+email: {profile.get('email','')}
+phone: {profile.get('phone','')}
+location: {profile.get('location','')}
+core_skills: {', '.join(profile.get('skills', []))}
+
+TARGET: {role or 'the role'} at {company or 'the company'}
+
+EXPERIENCE BANK (verbatim):
+{exp_text}
+
+JOB DESCRIPTION:
+{jd_text}
+
+Return strict JSON with:
+{{
+  "summary": "one short paragraph",
+  "skills": ["skill1","skill2","..."],
+  "experience": [
+    {{"role":"","company":"","years":"","bullets":["",""]}},
+    ...
+  ],
+  "cover_letter": {{
+    "greeting": "Dear ... ,",
+    "paragraphs": ["opening: why this role", "evidence from the experience bank", "closing: fit + next step"]
+  }}
+}}
+"""
+    return user
+
+def _package_context(profile: Dict[str, Any], data: Dict[str, Any], company: str, role: str) -> Dict[str, Dict[str, Any]]:
+    contact = _contact(profile)
+    letter = data.get("cover_letter") or {}
+    paragraphs = [p for p in (letter.get("paragraphs") or []) if isinstance(p, str) and p.strip()]
+    if not paragraphs:
+        paragraphs = [
+            data.get("summary")
+            or f"I am excited to apply for {role or 'this role'}"
+               f"{' at ' + company if company else ''}; my background in "
+               f"{', '.join(profile.get('skills', [])[:5]) or 'data and engineering'} is a strong match."
+        ]
+    return {
+        "resume": {
+            **contact,
+            "summary": data.get("summary",""),
+            "skills": data.get("skills", profile.get("skills", [])),
+            "experience": data.get("experience", []),
+        },
+        "cover": {
+            **contact,
+            "date": date.today().strftime("%B %d, %Y"),
+            "company": company,
+            "role": role,
+            "greeting": letter.get("greeting") or "Dear Hiring Team,",
+            "paragraphs": paragraphs,
+            "closing": "Sincerely,",
+        },
+    }
+
+def generate_package_context(
+    profile: Dict[str, Any],
+    jd_text: str,
+    experience_bank: List[Dict[str, str]],
+    company: str = "",
+    role: str = "",
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Resume + cover letter context from ONE model call.
+    Returns {"resume": <resume.html.j2 ctx>, "cover": <cover.html.j2 ctx>}.
+    """
+    data = chat_json(PACKAGE_SYSTEM, _package_prompt(profile, jd_text, experience_bank, company, role))
+    return _package_context(profile, data, company, role)
+
+async def agenerate_package_context(
+    profile: Dict[str, Any],
+    jd_text: str,
+    experience_bank: List[Dict[str, str]],
+    company: str = "",
+    role: str = "",
+) -> Dict[str, Dict[str, Any]]:
+    data = await achat_json(PACKAGE_SYSTEM, _package_prompt(profile, jd_text, experience_bank, company, role))
+    return _package_context(profile, data, company, role)
+
+ANSWER_FALLBACK = "I will tailor my impact based on the role’s needs; details available on request."
+
+def _answer_prompt(q: str, profile: Dict[str, Any], exp_text: str, jd_text: str) -> str:
+    return f"""
 PROFILE:
 {profile}
 
 EXPERIENCE BANK (verbatim):
 {exp_text}
 
-JOB DESCRIPTION (verbatim):
+JOB DESCRIPTION:
 {jd_text}
 
 QUESTION:
@@ -74,10 +197,131 @@ QUESTION:
 
 Write a concise answer (3–5 sentences). Use ONLY what's above. If specifics are missing, keep it truthful and general (skills, impact, approach).
 """
-        ans = chat_text(ANSWER_SYSTEM, user) or "I will tailor my impact based on the role’s needs; details available on request."
-        result[q] = ans
+
+def _batch_prompt(questions: List[str], profile: Dict[str, Any], exp_text: str, jd_text: str) -> str:
+    """All questions in one prompt; the shared context is sent once."""
+    numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1))
+    return f"""
+PROFILE:
+{profile}
+
+EXPERIENCE BANK (verbatim):
+{exp_text}
+
+JOB DESCRIPTION:
+{jd_text}
+
+QUESTIONS:
+{numbered}
+
+Answer EVERY question concisely (3–5 sentences each). Use ONLY what's above. If specifics are missing, keep it truthful and general (skills, impact, approach).
+Return strict JSON:
+{{"answers": [{{"id": 1, "answer": "..."}}, ...]}}
+"""
+
+def _parse_batch(questions: List[str], data: Dict[str, Any]) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    items = data.get("answers") if isinstance(data, dict) else None
+    if isinstance(items, dict):  # {"<question or id>": "answer"}
+        items = [{"id": k, "answer": v} for k, v in items.items()]
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        ans = item.get("answer")
+        ref = str(item.get("id", "")).strip()
+        if not isinstance(ans, str) or not ans.strip():
+            continue
+        if ref.isdigit() and 1 <= int(ref) <= len(questions):
+            out[questions[int(ref) - 1]] = ans.strip()
+        elif ref in questions:
+            out[ref] = ans.strip()
+    return out
+
+def draft_answers(
+    questions: List[str],
+    profile: Dict[str, Any],
+    experience_bank: List[Dict[str,str]],
+    jd_text: str,
+    batched: bool = True,
+) -> Dict[str,str]:
+    """
+    One chat_json call for the whole form (batched=True, 2+ questions); any
+    question missing from the batch reply falls back to its own chat_text call.
+    """
+    exp_text = _exp_text(experience_bank)
+    drafted: Dict[str,str] = {}
+    if batched and len(questions) > 1:
+        try:
+            drafted = _parse_batch(questions, chat_json(ANSWER_SYSTEM, _batch_prompt(questions, profile, exp_text, jd_text)))
+        except Exception:
+            drafted = {}
+    result: Dict[str,str] = {}
+    for q in questions:
+        result[q] = drafted.get(q) or chat_text(ANSWER_SYSTEM, _answer_prompt(q, profile, exp_text, jd_text)) or ANSWER_FALLBACK
     return result
 
+async def adraft_answers(
+    questions: List[str],
+    profile: Dict[str, Any],
+    experience_bank: List[Dict[str,str]],
+    jd_text: str,
+    batched: bool = True,
+) -> Dict[str,str]:
+    """draft_answers on the async client; per-question fallbacks run concurrently."""
+    exp_text = _exp_text(experience_bank)
+    drafted: Dict[str,str] = {}
+    if batched and len(questions) > 1:
+        try:
+            drafted = _parse_batch(questions, await achat_json(ANSWER_SYSTEM, _batch_prompt(questions, profile, exp_text, jd_text)))
+        except Exception:
+            drafted = {}
+    missing = [q for q in questions if not drafted.get(q)]
+    fills = await asyncio.gather(*(achat_text(ANSWER_SYSTEM, _answer_prompt(q, profile, exp_text, jd_text)) for q in missing))
+    drafted.update({q: a for q, a in zip(missing, fills) if a})
+    return {q: drafted.get(q) or ANSWER_FALLBACK for q in questions}
+
+def _personalize_prompt(recalled: Dict[str,str], jd_text: str, company: str, role: str) -> str:
+    items = "\n".join(f"{i}. Q: {q}\n   A: {a}" for i, (q, a) in enumerate(recalled.items(), 1))
+    return f"""
+TARGET: {role or 'the role'} at {company or 'the company'}
+
+JOB DESCRIPTION:
+{jd_text}
+
+PREVIOUSLY APPROVED ANSWERS:
+{items}
+
+Lightly adapt each answer to this job: keep its facts, length and voice; change only wording that
+names another employer or role, or add one clause linking it to the job. Do not add new claims.
+Return strict JSON:
+{{"answers": [{{"id": 1, "answer": "..."}}, ...]}}
+"""
+
+def personalize_answers(recalled: Dict[str,str], jd_text: str, company: str = "", role: str = "") -> Dict[str,str]:
+    """One cheap chat_json pass over remembered answers; any answer it drops stays as recalled."""
+    if not recalled:
+        return {}
+    questions = list(recalled)
+    prompt = _personalize_prompt(recalled, jd_text, company, role)
+    try:
+        data = chat_json(ANSWER_SYSTEM, prompt)
+    except Exception:
+        data = {}  # model unavailable: keep the recalled answers
+    adapted = _parse_batch(questions, data)
+    return {q: adapted.get(q) or recalled[q] for q in questions}
+
+async def apersonalize_answers(recalled: Dict[str,str], jd_text: str, company: str = "", role: str = "") -> Dict[str,str]:
+    if not recalled:
+        return {}
+    questions = list(recalled)
+    prompt = _personalize_prompt(recalled, jd_text, company, role)
+    try:
+        data = await achat_json(ANSWER_SYSTEM, prompt)
+    except Exception:
+        data = {}  # model unavailable: keep the recalled answers
+    adapted = _parse_batch(questions, data)
+    return {q: adapted.get(q) or recalled[q] for q in questions}
+
 def standard_answers(profile: Dict[str,str]) -> Dict[str,str]:
     first, *rest = (profile.get("name","Your Name").split() or ["Your"])
     last = " ".join(rest) or "Name"
@@ -0,0 +1,453 @@
+# app/utils/browser.py
+"""
+Process-wide pool of warm Chromium browsers for all Playwright work.
+
+Sync Playwright objects are bound to the thread that created them, so every
+pooled browser lives on its own worker thread. Callers lease a worker; each
+call made through the lease runs on that thread against a fresh, isolated
+BrowserContext, which is closed when the lease is released.
+
+AsyncBrowserPool is the async_api counterpart for code running on an event
+loop (async routes): browsers live on that loop and leases are async
+context managers yielding a fresh BrowserContext.
+"""
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
+from uuid import uuid4
+
+from loguru import logger
+
+from ..config import settings
+from ..services.winloop import run_playwright
+
+try:  # optional: only needed for RSS-based recycling
+    import psutil
+except ImportError:  # pragma: no cover
+    psutil = None
+
+T = TypeVar("T")
+
+
+# ---------- process helpers ----------
+def _browser_rss_mb(marker: str) -> Optional[float]:
+    """Total RSS (MB) of the Chromium tree launched with our marker switch."""
+    if psutil is None:
+        return None
+    for proc in psutil.process_iter(["cmdline"]):
+        try:
+            if marker not in " ".join(proc.info.get("cmdline") or []):
+                continue
+            procs = [proc] + proc.children(recursive=True)
+            total = 0
+            for p in procs:
+                try:
+                    total += p.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            return total / (1024 * 1024)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return None
+
+
+def _should_recycle(slot: int, uses: int, marker: str, max_uses: int, max_rss_mb: int) -> bool:
+    if max_uses and uses >= max_uses:
+        return True
+    if max_rss_mb and marker:
+        rss = _browser_rss_mb(marker)
+        if rss is not None and rss > max_rss_mb:
+            logger.info(f"browser slot {slot} at {rss:.0f} MB RSS; recycling")
+            return True
+    return False
+
+
+def _new_marker() -> str:
+    return f"applypilot-pool-{uuid4().hex[:12]}"
+
+
+# ---------- worker (one thread == one browser) ----------
+class _BrowserWorker:
+    def __init__(self, pool: "BrowserPool", slot: int):
+        self.pool = pool
+        self.slot = slot
+        self.uses = 0
+        self.browser = None
+        self.marker = ""
+        self._pw = None
+        self._startup_error: Optional[BaseException] = None
+        self._tasks: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"browser-pool-{slot}", daemon=True
+        )
+        self._thread.start()
+        if not self._ready.wait(settings.browser_start_timeout):
+            self._tasks.put(None)  # let the thread exit if Playwright ever comes up
+            raise TimeoutError(
+                f"browser worker {slot} did not start within {settings.browser_start_timeout:g}s"
+            )
+        if self._startup_error is not None:
+            raise self._startup_error
+
+    # --- thread plumbing ---
+    def _run(self) -> None:
+        # run_playwright may retry _serve with another loop policy (Windows), so the
+        # startup failure is recorded once it has given up, not on the first attempt
+        try:
+            run_playwright(self._serve)
+        except BaseException as e:
+            if not self._ready.is_set():
+                self._startup_error = e
+        finally:
+            self._ready.set()
+
+    def _serve(self) -> None:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            self._pw = p
+            self._ready.set()
+            while True:
+                item = self._tasks.get()
+                if item is None:
+                    break
+                fn, fut = item
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                try:
+                    fut.set_result(fn())
+                except BaseException as e:
+                    fut.set_exception(e)
+            self._close_browser()
+
+    def submit(self, fn: Callable[[], T]) -> "Future[T]":
+        fut: Future = Future()
+        self._tasks.put((fn, fut))
+        return fut
+
+    def call(self, fn: Callable[[], T]) -> T:
+        return self.submit(fn).result()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._tasks.put(None)
+        self._thread.join(timeout=timeout)
+
+    # --- browser lifecycle (worker thread only) ---
+    def _launch(self) -> None:
+        self.marker = _new_marker()
+        self.browser = self._pw.chromium.launch(
+            headless=self.pool.headless,
+            args=[f"--{self.marker}"],
+        )
+        self.uses = 0
+
+    def _close_browser(self) -> None:
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception:
+                pass
+        self.browser = None
+
+    def ensure_browser(self) -> None:
+        """Health check: relaunch if the browser died or was never started."""
+        if self.browser is None or not self.browser.is_connected():
+            self._close_browser()
+            self._launch()
+
+    def recycle(self) -> None:
+        self._close_browser()
+        self._launch()
+
+    def needs_recycle(self) -> bool:
+        return _should_recycle(
+            self.slot, self.uses, self.marker, self.pool.max_uses, self.pool.max_rss_mb
+        )
+
+
+# ---------- lease ----------
+class BrowserLease:
+    """
+    Exclusive use of one pooled browser with an isolated context.
+    Everything passed to call() runs on the browser's own thread.
+    """
+
+    def __init__(self, pool: "BrowserPool", worker: _BrowserWorker, context_options: Dict[str, Any]):
+        self._pool = pool
+        self._worker = worker
+        self._ctx = None
+
+        def _open():
+            worker.ensure_browser()
+            worker.uses += 1
+            return worker.browser.new_context(**context_options)
+
+        try:
+            self._ctx = worker.call(_open)
+        except BaseException:
+            pool._release(worker)
+            raise
+
+    def call(self, fn: Callable[[Any], T]) -> T:
+        """Run fn(context) on the browser thread and return its result."""
+        if self._ctx is None:
+            raise RuntimeError("browser lease already released")
+        ctx = self._ctx
+        return self._worker.call(lambda: fn(ctx))
+
+    def close(self) -> None:
+        if self._ctx is None:
+            return
+        ctx, self._ctx = self._ctx, None
+
+        def _close():
+            try:
+                ctx.close()
+            except Exception:
+                pass
+
+        try:
+            self._worker.call(_close)
+        finally:
+            self._pool._release(self._worker)
+
+    def __enter__(self) -> "BrowserLease":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------- pool ----------
+class BrowserPool:
+    def __init__(
+        self,
+        size: int,
+        headless: bool = True,
+        max_uses: int = 0,
+        max_rss_mb: int = 0,
+        lease_timeout: Optional[float] = None,
+    ):
+        self.size = max(1, int(size))
+        self.headless = headless
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.lease_timeout = lease_timeout
+        self._closed = False
+        self._workers: List[_BrowserWorker] = []
+        try:
+            for i in range(self.size):
+                self._workers.append(_BrowserWorker(self, i))
+        except BaseException:
+            for w in self._workers:
+                w.stop()
+            raise
+        self._idle: "queue.Queue[_BrowserWorker]" = queue.Queue()
+        for w in self._workers:
+            self._idle.put(w)
+
+    def warm_up(self) -> None:
+        """Launch every browser in the background (does not block)."""
+        for w in self._workers:
+            w.submit(w.ensure_browser)
+
+    def lease(self, timeout: Optional[float] = None, **context_options) -> BrowserLease:
+        if self._closed:
+            raise RuntimeError("browser pool is shut down")
+        try:
+            worker = self._idle.get(timeout=timeout if timeout is not None else self.lease_timeout)
+        except queue.Empty:
+            raise TimeoutError("no pooled browser became available in time")
+        return BrowserLease(self, worker, context_options)
+
+    def run(self, fn: Callable[[Any], T], **context_options) -> T:
+        """Lease a browser, run fn(context) on it, release it."""
+        with self.lease(**context_options) as lease:
+            return lease.call(fn)
+
+    def _release(self, worker: _BrowserWorker) -> None:
+        if self._closed:
+            return
+
+        def _maybe_recycle():
+            if worker.needs_recycle():
+                worker.recycle()
+
+        # queued ahead of the next lease on this thread, so it never races a task
+        worker.submit(_maybe_recycle)
+        self._idle.put(worker)
+
+    def shutdown(self) -> None:
+        self._closed = True
+        for w in self._workers:
+            w.stop()
+
+
+# ---------- async pool (browsers live on one event loop) ----------
+class _AsyncSlot:
+    def __init__(self, slot: int):
+        self.slot = slot
+        self.uses = 0
+        self.browser = None
+        self.marker = ""
+
+
+class AsyncBrowserPool:
+    def __init__(
+        self,
+        size: int,
+        headless: bool = True,
+        max_uses: int = 0,
+        max_rss_mb: int = 0,
+        lease_timeout: Optional[float] = None,
+    ):
+        self.size = max(1, int(size))
+        self.headless = headless
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.lease_timeout = lease_timeout
+        self._pw = None
+        self._closed = False
+        self._start_lock = asyncio.Lock()
+        self._slots = [_AsyncSlot(i) for i in range(self.size)]
+        self._idle: "asyncio.Queue[_AsyncSlot]" = asyncio.Queue()
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+
+    async def _ensure_started(self) -> None:
+        if self._pw is not None:
+            return
+        async with self._start_lock:
+            if self._pw is None:
+                from playwright.async_api import async_playwright
+                self._pw = await async_playwright().start()
+
+    async def _ensure_browser(self, slot: _AsyncSlot) -> None:
+        if slot.browser is not None and slot.browser.is_connected():
+            return
+        await self._close_browser(slot)
+        slot.marker = _new_marker()
+        slot.browser = await self._pw.chromium.launch(
+            headless=self.headless,
+            args=[f"--{slot.marker}"],
+        )
+        slot.uses = 0
+
+    async def _close_browser(self, slot: _AsyncSlot) -> None:
+        if slot.browser is not None:
+            try:
+                await slot.browser.close()
+            except Exception:
+                pass
+        slot.browser = None
+
+    async def warm_up(self) -> None:
+        await self._ensure_started()
+        await asyncio.gather(
+            *(self._ensure_browser(s) for s in self._slots), return_exceptions=True
+        )
+
+    @asynccontextmanager
+    async def lease(self, timeout: Optional[float] = None, **context_options) -> AsyncIterator[Any]:
+        """Yield a fresh BrowserContext on a pooled browser; closed on exit."""
+        if self._closed:
+            raise RuntimeError("browser pool is shut down")
+        await self._ensure_started()
+        try:
+            slot = await asyncio.wait_for(
+                self._idle.get(), timeout if timeout is not None else self.lease_timeout
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError("no pooled browser became available in time")
+        try:
+            await self._ensure_browser(slot)
+            slot.uses += 1
+            ctx = await slot.browser.new_context(**context_options)
+            try:
+                yield ctx
+            finally:
+                try:
+                    await ctx.close()
+                except Exception:
+                    pass
+        finally:
+            if not self._closed:
+                recycle = await asyncio.to_thread(
+                    _should_recycle, slot.slot, slot.uses, slot.marker,
+                    self.max_uses, self.max_rss_mb,
+                )
+                if recycle:
+                    await self._close_browser(slot)  # relaunched lazily on next lease
+            self._idle.put_nowait(slot)
+
+    async def shutdown(self) -> None:
+        self._closed = True
+        for slot in self._slots:
+            await self._close_browser(slot)
+        if self._pw is not None:
+            try:
+                await self._pw.stop()
+            except Exception:
+                pass
+            self._pw = None
+
+
+# ---------- process-wide registry ----------
+_POOLS: Dict[bool, BrowserPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_browser_pool(headless: bool = True) -> BrowserPool:
+    """Return the shared pool for headless (or headed) Chromium, creating it on first use."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(headless)
+        if pool is None:
+            pool = BrowserPool(
+                size=settings.browser_pool_size,
+                headless=headless,
+                max_uses=settings.browser_max_uses,
+                max_rss_mb=settings.browser_max_rss_mb,
+                lease_timeout=settings.browser_lease_timeout,
+            )
+            _POOLS[headless] = pool
+        return pool
+
+
+def shutdown_browser_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+# async pools are bound to the loop that created them
+_ASYNC_POOLS: Dict[Tuple[int, bool], AsyncBrowserPool] = {}
+
+
+def get_async_browser_pool(headless: bool = True) -> AsyncBrowserPool:
+    """Return the shared async pool for the running event loop."""
+    key = (id(asyncio.get_running_loop()), headless)
+    pool = _ASYNC_POOLS.get(key)
+    if pool is None:
+        pool = AsyncBrowserPool(
+            size=settings.browser_pool_size,
+            headless=headless,
+            max_uses=settings.browser_max_uses,
+            max_rss_mb=settings.browser_max_rss_mb,
+            lease_timeout=settings.browser_lease_timeout,
+        )
+        _ASYNC_POOLS[key] = pool
+    return pool
+
+
+async def shutdown_async_browser_pools() -> None:
+    """Close the async pools that belong to the running event loop."""
+    loop_id = id(asyncio.get_running_loop())
+    for key in [k for k in _ASYNC_POOLS if k[0] == loop_id]:
+        await _ASYNC_POOLS.pop(key).shutdown()
@@ -0,0 +1,107 @@
+# app/utils/http.py
+"""
+Shared, pooled HTTP clients for JD fetching and source importers.
+
+One httpx.AsyncClient per event loop (httpx's async transport is loop-bound,
+and the autopilot runs short-lived loops via asyncio.run), created at startup
+for the server loop and closed at shutdown. Connections are kept alive across
+calls, HTTP/2 is used when the `h2` package is installed (httpx[http2]), and
+each host gets a small number of concurrent requests so a batch against one
+ATS doesn't open dozens of sockets to it. A sync client covers the few
+blocking callers.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config import settings
+
+try:  # optional: HTTP/2 needs httpx[http2]
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:  # pragma: no cover
+    _HTTP2 = False
+
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        "http2": _HTTP2 and settings.http2_enabled,
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout),
+    }
+
+
+class _LoopHttp:
+    """The client and per-host slots for one event loop."""
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(**_client_options())
+        self.hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def host_slots(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        sem = self.hosts.get(host)
+        if sem is None:
+            sem = self.hosts[host] = asyncio.Semaphore(max(1, settings.http_per_host))
+        return sem
+
+
+_loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopHttp]" = weakref.WeakKeyDictionary()
+
+
+def _loop_http() -> _LoopHttp:
+    loop = asyncio.get_running_loop()
+    state = _loops.get(loop)
+    if state is None or state.client.is_closed:
+        state = _loops[loop] = _LoopHttp()
+    return state
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The pooled AsyncClient for the running event loop."""
+    return _loop_http().client
+
+
+async def http_get(url: str, **kwargs) -> httpx.Response:
+    """GET through the loop's pooled client, holding one of the host's slots."""
+    state = _loop_http()
+    async with state.host_slots(url):
+        return await state.client.get(url, **kwargs)
+
+
+async def close_http_client() -> None:
+    """Close the running loop's client (server shutdown, end of an asyncio.run batch)."""
+    state = _loops.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state.client.aclose()
+
+
+# ---------- sync ----------
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+
+
+def get_sync_http_client() -> httpx.Client:
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(**_client_options())
+        return _sync_client
+
+
+def close_sync_http_client() -> None:
+    global _sync_client
+    with _sync_lock:
+        client, _sync_client = _sync_client, None
+    if client is not None:
+        client.close()
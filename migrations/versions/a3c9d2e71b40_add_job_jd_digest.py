@@ -0,0 +1,30 @@
+"""add job jd_digest
+
+Revision ID: a3c9d2e71b40
+Revises: f1edc57537f9
+Create Date: 2026-10-18 10:12:31.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9d2e71b40'
+down_revision: Union[str, Sequence[str], None] = 'f1edc57537f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.add_column(sa.Column('jd_digest', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('jd_digest')
@@ -0,0 +1,44 @@
+"""add answer_memory
+
+Revision ID: c7e4b1d09a52
+Revises: a3c9d2e71b40
+Create Date: 2026-10-18 14:03:52.611804
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e4b1d09a52'
+down_revision: Union[str, Sequence[str], None] = 'a3c9d2e71b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('answer_memory',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('fingerprint', sa.String(length=40), nullable=False),
+    sa.Column('question', sa.Text(), nullable=False),
+    sa.Column('answer', sa.Text(), nullable=False),
+    sa.Column('source', sa.String(length=40), nullable=False),
+    sa.Column('company', sa.String(length=200), nullable=False),
+    sa.Column('uses', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('profile_id', 'fingerprint', name='uq_answer_memory_profile_fp')
+    )
+    op.create_index(op.f('ix_answer_memory_profile_id'), 'answer_memory', ['profile_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_answer_memory_profile_id'), table_name='answer_memory')
+    op.drop_table('answer_memory')
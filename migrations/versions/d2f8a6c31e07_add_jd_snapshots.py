@@ -0,0 +1,52 @@
+"""add jd_texts and jd_snapshots
+
+Revision ID: d2f8a6c31e07
+Revises: c7e4b1d09a52
+Create Date: 2026-10-18 16:41:09.327415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8a6c31e07'
+down_revision: Union[str, Sequence[str], None] = 'c7e4b1d09a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jd_texts',
+    sa.Column('hash', sa.String(length=40), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.create_table('jd_snapshots',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.String(length=1000), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('html_gz', sa.LargeBinary(), nullable=True),
+    sa.Column('text_hash', sa.String(length=40), nullable=False),
+    sa.Column('etag', sa.String(length=256), nullable=False),
+    sa.Column('last_modified', sa.String(length=64), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(), nullable=False),
+    sa.Column('checked_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.ForeignKeyConstraint(['text_hash'], ['jd_texts.hash'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_id')
+    )
+    op.create_index(op.f('ix_jd_snapshots_text_hash'), 'jd_snapshots', ['text_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_jd_snapshots_text_hash'), table_name='jd_snapshots')
+    op.drop_table('jd_snapshots')
+    op.drop_table('jd_texts')
@@ -0,0 +1,36 @@
+"""add job import fields
+
+Revision ID: e5a1c8f47b93
+Revises: d2f8a6c31e07
+Create Date: 2026-10-18 18:22:40.915862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1c8f47b93'
+down_revision: Union[str, Sequence[str], None] = 'd2f8a6c31e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.add_column(sa.Column('department', sa.String(length=200), nullable=False, server_default=''))
+        batch_op.add_column(sa.Column('external_id', sa.String(length=120), nullable=False, server_default=''))
+        batch_op.add_column(sa.Column('source_updated_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('description', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('description')
+        batch_op.drop_column('source_updated_at')
+        batch_op.drop_column('external_id')
+        batch_op.drop_column('department')
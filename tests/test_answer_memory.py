@@ -0,0 +1,44 @@
+# tests/test_answer_memory.py
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers the tables)
+from app.database import Base
+from app.models import AnswerMemory
+from app.services.answer_memory import recall_answers, remember_answers, remember_submitted
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()  # same flags as app.database
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_remember_merges_labels_that_normalize_alike(db):
+    answers = {
+        "Why do you want to work at Datadog?": "first",
+        "Why do you want to work at Datadog? *": "second",
+    }
+    assert remember_answers(db, 1, answers, company="Datadog") == 2
+
+    rows = db.query(AnswerMemory).all()
+    assert len(rows) == 1
+    assert rows[0].answer == "second"
+
+
+def test_remember_submitted_with_duplicate_labels(db):
+    answers = {"Why us?": "because", "Why us? (required)": "because"}
+    sources = {"Why us?": "exact", "Why us? (required)": "exact"}
+    remember_submitted(db, 1, answers, sources, company="Acme")
+
+    assert db.query(AnswerMemory).count() == 1
+    assert recall_answers(db, 1, ["Why us?"], company="Acme")["Why us?"]["answer"] == "because"